@@ -0,0 +1,153 @@
+# python -m agent.batch_runner prompts.jsonl --concurrency 8 --timeout 120 --mode auto --output batch_results.jsonl
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from bigquery.data_cache import pinned, warm_snapshot
+from structured_logging import setup_logging
+from .bigquery_cost_optimizer_agent import answer_prompt, build_runner, compare_paths
+
+logger = logging.getLogger(__name__)
+
+
+def read_prompts(path):
+    """
+    Stream prompts from a JSONL file, one request per line.
+
+    Each line is a JSON object. The prompt text is taken from 'prompt'
+    (falling back to 'body', so backlog-style files with request_id/title/body
+    work as-is) and the id from 'id' or 'request_id' (falling back to the line number).
+    Blank lines are skipped, and so are rows without prompt text (with a warning).
+    A line that is not valid JSON is yielded with its error instead of a prompt,
+    so it becomes an error row without stopping the batch.
+
+    Args:
+        path (str): Path to the JSONL file.
+
+    Yields:
+        tuple: (request_id, prompt, error) for every non-empty line; `error` is
+        None unless the line could not be parsed, and then `prompt` is None.
+    """
+    with open(path, encoding='utf-8') as prompts_file:
+        for line_number, line in enumerate(prompts_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield str(line_number), None, f'Malformed prompt line: {e}'
+                continue
+            if not isinstance(record, dict):
+                yield str(line_number), None, 'Malformed prompt line: expected a JSON object'
+                continue
+            request_id = record.get('id', record.get('request_id', line_number))
+            prompt = record.get('prompt') or record.get('body')
+            if not isinstance(prompt, str) or not prompt.strip():
+                logger.warning('Skipping prompt without text', extra={'data': {'line': line_number,
+                                                                                'id': request_id}})
+                continue
+            yield str(request_id), prompt, None
+
+
+async def run_batch(prompts_path, output_path, concurrency: int = 8, timeout: float = 120.0, days_back: int = 30,
+                    mode: str = 'auto'):
+    """
+    Run every prompt of a JSONL file through the advisor agent with bounded concurrency.
+
+    The BigQuery data points are loaded once before the batch starts and shared by
+    all prompts, pinned until the batch ends (see `bigquery.data_cache`), and one agent runner is reused with a
+    separate session per prompt. Prompts are read lazily and at most `concurrency`
+    of them are in flight at any time. Results are appended to `output_path` as
+    JSON lines in completion order.
+
+    Args:
+        prompts_path (str): JSONL file with the prompts (see `read_prompts`).
+        output_path (str): JSONL file the results are written to.
+        concurrency (int): Maximum number of prompts running at the same time.
+        timeout (float): Per-prompt timeout in seconds.
+        days_back (int): Days of slot utilization history in the shared snapshot.
+        mode (str): 'auto', 'pipeline', 'llm' or 'compare' (see `answer_prompt`). In
+            'compare' mode each result also carries a 'comparison' of both paths.
+
+    Returns:
+        dict: Summary with 'total', 'ok', 'timeout', 'error' counts and 'wall_seconds'.
+
+    Raises:
+        ValueError: If `concurrency` is less than 1.
+    """
+    if concurrency < 1:
+        raise ValueError(f'concurrency must be at least 1, got {concurrency}')
+    started = time.perf_counter()
+    with pinned():
+        # Load the data snapshot off the event loop; the tools then answer from the cache,
+        # which keeps it until the batch is done even if the batch outlives the TTL
+        await asyncio.to_thread(warm_snapshot, days_back)
+        runner = build_runner()
+
+        queue = asyncio.Queue(maxsize=concurrency * 2)
+        summary = {'total': 0, 'ok': 0, 'timeout': 0, 'error': 0}
+
+        with open(output_path, 'w', encoding='utf-8') as output_file:
+
+            async def worker():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        queue.task_done()
+                        return
+                    request_id, prompt, error = item
+                    request_started = time.perf_counter()
+                    record = {'id': request_id, 'prompt': prompt}
+                    session_id = f'batch-{request_id}-{uuid.uuid4().hex[:8]}'
+                    try:
+                        if error:
+                            raise ValueError(error)
+                        if mode == 'compare':
+                            comparison = await asyncio.wait_for(compare_paths(prompt, runner, session_id), timeout=timeout)
+                            record['response'] = comparison['pipeline']['response']
+                            record['comparison'] = comparison
+                        else:
+                            record['response'] = await asyncio.wait_for(
+                                answer_prompt(prompt, mode, runner, session_id), timeout=timeout
+                            )
+                        record['status'] = 'ok'
+                    except asyncio.TimeoutError:
+                        record['status'] = 'timeout'
+                    except Exception as e:
+                        record['status'] = 'error'
+                        record['error'] = f'{type(e).__name__}: {e}'
+                    record['latency_ms'] = round((time.perf_counter() - request_started) * 1000, 1)
+                    summary['total'] += 1
+                    summary[record['status']] += 1
+                    output_file.write(json.dumps(record) + '\n')
+                    output_file.flush()
+                    queue.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            for item in read_prompts(prompts_path):
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+    summary['wall_seconds'] = round(time.perf_counter() - started, 2)
+    print('#### Batch Summary :: ', json.dumps(summary))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a JSONL file of prompts through the BigQuery cost optimizer agent.')
+    parser.add_argument('prompts', help='JSONL file with one {"id": ..., "prompt": ...} object per line')
+    parser.add_argument('--output', default='batch_results.jsonl', help='JSONL file for the results')
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum prompts in flight')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Per-prompt timeout in seconds')
+    parser.add_argument('--days-back', type=int, default=30, help='Days of slot utilization history to load')
+    parser.add_argument('--mode', choices=['auto', 'pipeline', 'llm', 'compare'], default='auto',
+                        help='auto: pipeline for slot-sizing prompts, LLM otherwise')
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(run_batch(args.prompts, args.output, args.concurrency, args.timeout, args.days_back, args.mode))
@@ -7,80 +7,136 @@ from google.genai import types
 from google.adk.tools import google_search  # The Google Search tool
 from bigquery.slot_utilization_gemini import get_bigquery_slot_utilization_for_project
 from bigquery.bigquery_byte_scanned import get_query_demand
-from bigquery.optimize_bigquery_slots import optimize_slots
+from bigquery import optimize_bigquery_slots
+from .slot_pipeline import is_slot_sizing_prompt, run_slot_pipeline
+import argparse
+import functools
+import logging
 import os
+import time
 from dotenv import load_dotenv
 import sys
 import textwrap
 import json
 sys.path.append(".")
-import google.cloud.logging
+from structured_logging import setup_logging
 
 # 1. Load environment variables from the agent directory's .env file
 load_dotenv()
 model_name = os.getenv("MODEL")
 
-cloud_logging_client = google.cloud.logging.Client()
-cloud_logging_client.setup_logging()
+logger = logging.getLogger(__name__)
 
 
-# Create an async main function
-async def bigquery_cost_optimizer_agent(prompt):
+# 2. Set or load other variables
+app_name = 'big_query_optimizer_agent'
+user_id_1 = 'user001'
+
+
+def _off_event_loop(tool):
     """
-        Use Google ADK LlmAgent with google_search tool to optimize bigquery cost.
+        Wrap a blocking tool as a coroutine that runs it on a worker thread.
+
+        ADK calls synchronous tools directly on the event loop, so a BigQuery
+        fetch after the data snapshot expires (or an OR-Tools solve) would stall
+        every other prompt of a batch. The wrapper keeps the tool's name,
+        signature and docstring, which ADK builds the tool declaration from.
     """
-    
-    # 2. Set or load other variables
-    app_name = 'big_query_optimizer_agent'
-    user_id_1 = 'user001'
-    session = 'fsession001'
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(tool, *args, **kwargs)
+    return wrapper
+
 
+def optimize_slots(query_demand: float, max_slots: int = 50):
+    """
+        Optimize the allocation between reserved BigQuery slots and on-demand bytes
+        processed to minimize cost.
+
+        Agent-facing wrapper of `bigquery.optimize_bigquery_slots.optimize_slots`:
+        the solver backend, limits and threads stay at their defaults and are not
+        exposed to the model.
+
+        Args:
+            query_demand (float): Monthly BigQuery query demand in tebibytes (TiB) processed.
+            max_slots (int): Maximum number of reserved slots to consider. Default is 50.
+
+        Returns:
+            tuple: (reserved_slots, on_demand_tib), the slots to reserve and the TiB
+            left to on-demand pricing.
+    """
+    return optimize_bigquery_slots.optimize_slots(query_demand, max_slots)
 
+
+def build_runner():
+    """
+        Build the BigQueryOptimizerAgent and an InMemoryRunner for it.
+
+        The runner is safe to share between concurrent prompts as long as each
+        prompt uses its own session.
+    """
     # 3. Define Your Agent
     root_agent = Agent(
         model=model_name,
         name="BigQueryOptimizerAgent",
         description= description,
         instruction= instruction,
-        tools=[get_query_demand, get_bigquery_slot_utilization_for_project, optimize_slots]
+        tools=[_off_event_loop(tool) for tool in (get_query_demand, get_bigquery_slot_utilization_for_project,
+                                                   optimize_slots)]
     )
 
     # 3. Create a Runner
-    runner = InMemoryRunner(
+    return InMemoryRunner(
         agent=root_agent,
         app_name=app_name,
     )
 
+
+# 5. Prepare a function to package a user's message as
+# genai.types.Content, run it asynchronously, and iterate
+# through the response
+async def run_prompt(runner: InMemoryRunner, session: Session, new_message: str, usage: dict = None):
+    """
+        Send one prompt to the agent in the given session and return the first text reply.
+
+        If `usage` is given, the token counts reported by the model are added to
+        usage['total_tokens'].
+    """
+    logger.info('New prompt', extra={'data': {'session_id': session.id, 'prompt': new_message}})
+    content = types.Content(
+            role='user', parts=[types.Part.from_text(text=new_message)]
+        )
+    async for event in runner.run_async(
+        user_id=session.user_id,
+        session_id=session.id,
+        new_message=content,
+    ):
+        if usage is not None and event.usage_metadata and event.usage_metadata.total_token_count:
+            usage['total_tokens'] = usage.get('total_tokens', 0) + event.usage_metadata.total_token_count
+        if event.content and event.content.parts and event.content.parts[0].text:
+            logger.info('Agent reply', extra={'data': {'session_id': session.id, 'author': event.author,
+                                                       'text': event.content.parts[0].text}})
+            return event.content.parts[0].text
+
+
+# Create an async main function
+async def bigquery_cost_optimizer_agent(prompt, runner: InMemoryRunner = None, session_id: str = 'fsession001', usage: dict = None):
+    """
+        Use Google ADK LlmAgent with google_search tool to optimize bigquery cost.
+
+        Pass a shared `runner` (see `build_runner`) and a unique `session_id` to
+        run several prompts concurrently against one agent.
+    """
+    if runner is None:
+        runner = build_runner()
+
     # 4. Create a session
     my_session = await runner.session_service.create_session(
-        app_name=app_name, user_id=user_id_1, session_id = session
+        app_name=app_name, user_id=user_id_1, session_id = session_id
     )
 
-    # 5. Prepare a function to package a user's message as
-    # genai.types.Content, run it asynchronously, and iterate
-    # through the response 
-    async def run_prompt(session: Session, new_message: str):
-        print('$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$')
-        print('#### New prompt :: ', new_message)
-        print('------------------------------------------------------------- ')
-        content = types.Content(
-                role='user', parts=[types.Part.from_text(text=new_message)]
-            )
-        print('####  User says: ', content.model_dump(exclude_none=True))
-        print('------------------------------------------------------------- ')
-        async for event in runner.run_async(
-            user_id=user_id_1,
-            session_id=session.id,
-            new_message=content,
-        ):
-            if event.content.parts and event.content.parts[0].text:
-                print(f'#### {event.author}: {event.content.parts[0].text}')
-                return event.content.parts[0].text
-        cloud_logging_client.close()
-
-
     # 6. Use this function on a new query
-    result = await run_prompt(my_session, prompt)
+    result = await run_prompt(runner, my_session, prompt, usage)
     # Specify the filename
     filename = "bigquery_slot_optimization_result.txt"
     #result = json.dumps(result, indent=4)
@@ -98,4 +154,59 @@ async def bigquery_cost_optimizer_agent(prompt):
     # print(f"Content saved to {filename}")
     return result
 
-asyncio.run(bigquery_cost_optimizer_agent("How to optimize slot usage for bigquery?"))
\ No newline at end of file
+
+async def answer_prompt(prompt, mode: str = 'auto', runner: InMemoryRunner = None, session_id: str = 'fsession001'):
+    """
+        Answer a prompt through the deterministic slot pipeline or the LLM agent.
+
+        Modes:
+            'auto'     - slot-sizing prompts use the pipeline, everything else the LLM.
+            'pipeline' - always use the pipeline (see `slot_pipeline.run_slot_pipeline`).
+            'llm'      - always use the LLM agent.
+            'compare'  - run both paths and print latency/token usage side by side;
+                         returns the pipeline answer.
+    """
+    if mode == 'compare':
+        comparison = await compare_paths(prompt, runner, session_id)
+        return comparison['pipeline']['response']
+    if mode == 'pipeline' or (mode == 'auto' and is_slot_sizing_prompt(prompt)):
+        return await run_slot_pipeline()
+    if mode not in ('auto', 'llm'):
+        raise ValueError(f"Unknown mode '{mode}', expected auto, pipeline, llm or compare")
+    return await bigquery_cost_optimizer_agent(prompt, runner, session_id)
+
+
+async def compare_paths(prompt, runner: InMemoryRunner = None, session_id: str = 'fsession001'):
+    """
+        Run a prompt through both the slot pipeline and the LLM agent.
+
+        Returns:
+            dict: {'pipeline': {...}, 'llm': {...}} with 'response', 'latency_ms'
+            and 'total_tokens' for each path.
+    """
+    started = time.perf_counter()
+    pipeline_response = await run_slot_pipeline()
+    pipeline_ms = (time.perf_counter() - started) * 1000
+
+    usage = {'total_tokens': 0}
+    started = time.perf_counter()
+    llm_response = await bigquery_cost_optimizer_agent(prompt, runner, session_id, usage)
+    llm_ms = (time.perf_counter() - started) * 1000
+
+    comparison = {
+        'pipeline': {'response': pipeline_response, 'latency_ms': round(pipeline_ms, 1), 'total_tokens': 0},
+        'llm': {'response': llm_response, 'latency_ms': round(llm_ms, 1), 'total_tokens': usage['total_tokens']},
+    }
+    logger.info('Pipeline vs LLM', extra={'data': {path: {k: v for k, v in stats.items() if k != 'response'}
+                                                   for path, stats in comparison.items()}})
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ask the BigQuery cost optimizer agent a question.')
+    parser.add_argument('prompt', nargs='?', default="How to optimize slot usage for bigquery?")
+    parser.add_argument('--mode', choices=['auto', 'pipeline', 'llm', 'compare'], default='auto',
+                        help='auto: pipeline for slot-sizing prompts, LLM otherwise')
+    args = parser.parse_args()
+    setup_logging()
+    print('#### Recommendation :: ', asyncio.run(answer_prompt(args.prompt, args.mode)))
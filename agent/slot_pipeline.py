@@ -0,0 +1,120 @@
+import asyncio
+import re
+from bigquery.bigquery_byte_scanned import get_query_demand
+from bigquery.slot_utilization_gemini import get_bigquery_slot_utilization_for_project
+from bigquery.optimize_bigquery_slots import optimize_slots
+from bigquery.bigquery_cost_calculator import ON_DEMAND_COST_PER_TB_BY_REGION, FLAT_RATE_SLOT_HOURLY_COST
+
+# Sizing intent: a how-many/optimize/size/recommend verb aimed at slots, e.g.
+#   "How to optimize slot usage for bigquery?"   "How many slots should we reserve?"
+#   "Recommend a slot reservation for us"        "Can you size our BigQuery slots?"
+# Conceptual questions go to the LLM even when they mention reservations or pricing:
+#   "What is a reservation slot?"                "Explain flat-rate vs on-demand slot pricing"
+#   "Why are my slots idle?"                     "What does slot optimization mean?"
+SLOT_SIZING_PATTERN = re.compile(
+    r"^(?!\s*(?:what\s+(?:is|are|does|do)|what's\s+an?|why|explain|describe|define|tell me about)\b)(?=.*(?:"
+    r'\bhow\s+many\s+(?:\w+\s+){0,3}slots?\b'
+    r'|\b(?:optimi[sz]e|size|right-?size|recommend)\s+(?:[\w-]+\s+){0,4}slots?\b'
+    r'|\bslots?\s+(?:\w+\s+)?(?:sizing|optimi[sz]ation|recommendations?)\b'
+    r'))',
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Prompts scoped to a project or region go to the LLM: the pipeline always answers
+# for config.PROJECT_ID / REGION, so the named target would be silently ignored, e.g.
+#   "How many slots does project analytics-prod need?"   "Size our slots in europe-west2"
+#   "Optimize slots for the EU region"
+# 'us' alone is not matched; it is far more often the pronoun than the multi-region.
+SCOPED_PROMPT_PATTERN = re.compile(
+    r'\b(?:projects?|regions?|eu)\b'
+    r'|\b(?:us|europe|asia|australia|northamerica|southamerica|me|africa)-[a-z]+\d*\b',
+    re.IGNORECASE,
+)
+
+HOURS_PER_MONTH = 24 * 30
+
+RECOMMENDATION_TEMPLATE = """Based on {query_demand} TiB processed in the last 30 days and {slot_hours} slot-hours consumed in the last {days_back} days (about {average_slots} slots on average), the most cost-effective allocation is:
+
+*   **Flat-Rate Slots**: reserve {reserved_slots} slot(s) for ${flat_rate_cost}/month.
+*   **On-Demand Usage**: process the remaining {on_demand_tib} TiB on-demand for ${on_demand_cost}/month.
+
+Estimated total: ${total_cost}/month versus ${on_demand_only_cost}/month fully on-demand (saving ${savings}/month).
+Review the reservation monthly as query volume changes, and use on-demand for spiky workloads above the baseline."""
+
+
+def is_slot_sizing_prompt(prompt: str):
+    """
+    Check whether a prompt is the standard slot-sizing question the pipeline can answer.
+
+    Args:
+        prompt (str): User prompt.
+
+    Returns:
+        bool: True if the prompt asks how to size or optimize BigQuery slots and
+        does not name a project or region (see `SCOPED_PROMPT_PATTERN`).
+    """
+    return (bool(prompt) and SLOT_SIZING_PATTERN.search(prompt) is not None
+            and SCOPED_PROMPT_PATTERN.search(prompt) is None)
+
+
+async def run_slot_pipeline(days_back: int = 30, max_slots: int = 50, region: str = 'us'):
+    """
+    Answer the slot-sizing question without an LLM round-trip.
+
+    Runs the same tools the agent would call, in the same order:
+    `get_query_demand` and `get_bigquery_slot_utilization_for_project` in parallel
+    (they are independent), then `optimize_slots` on the query demand, and renders
+    the recommendation from `RECOMMENDATION_TEMPLATE`.
+
+    Args:
+        days_back (int): Days of slot utilization history to look at. Query demand
+            is always the last 30 days, the monthly figure `optimize_slots` expects.
+        max_slots (int): Upper bound on reserved slots passed to `optimize_slots`.
+        region (str): Pricing region for the cost figures.
+
+    Returns:
+        str: The rendered recommendation.
+    """
+    query_demand, slot_utilization = await asyncio.gather(
+        asyncio.to_thread(get_query_demand),
+        asyncio.to_thread(get_bigquery_slot_utilization_for_project, days_back),
+    )
+    reserved, on_demand = await asyncio.to_thread(optimize_slots, query_demand, max_slots)
+    return render_recommendation(query_demand, slot_utilization, reserved, on_demand, days_back, region)
+
+
+def render_recommendation(query_demand, slot_utilization, reserved, on_demand, days_back: int = 30, region: str = 'us'):
+    """
+    Fill `RECOMMENDATION_TEMPLATE` with the tool outputs and the derived costs.
+
+    Args:
+        query_demand (float): TiB processed in the last 30 days (from `get_query_demand`,
+            which always looks back 30 days; `optimize_slots` treats it as monthly demand).
+        slot_utilization (dict): Output of `get_bigquery_slot_utilization_for_project`.
+        reserved (float): Reserved slots from `optimize_slots`.
+        on_demand (float): On-demand TiB from `optimize_slots`.
+        days_back (int): Days of slot utilization history in `slot_utilization`.
+        region (str): Pricing region.
+
+    Returns:
+        str: The rendered recommendation.
+    """
+    on_demand_cost_per_tb = ON_DEMAND_COST_PER_TB_BY_REGION.get(region.lower(), 6.25)
+    slot_hours = (slot_utilization or {}).get('total_slot_hours_consumed', 0.0)
+    flat_rate_cost = reserved * FLAT_RATE_SLOT_HOURLY_COST * HOURS_PER_MONTH
+    on_demand_cost = on_demand * on_demand_cost_per_tb
+    total_cost = flat_rate_cost + on_demand_cost
+    on_demand_only_cost = query_demand * on_demand_cost_per_tb
+    return RECOMMENDATION_TEMPLATE.format(
+        query_demand=query_demand,
+        slot_hours=slot_hours,
+        days_back=days_back,
+        average_slots=round(slot_hours / (days_back * 24), 2) if days_back else 0,
+        reserved_slots=int(round(reserved)),
+        flat_rate_cost=f'{flat_rate_cost:,.2f}',
+        on_demand_tib=round(on_demand, 2),
+        on_demand_cost=f'{on_demand_cost:,.2f}',
+        total_cost=f'{total_cost:,.2f}',
+        on_demand_only_cost=f'{on_demand_only_cost:,.2f}',
+        savings=f'{max(on_demand_only_cost - total_cost, 0.0):,.2f}',
+    )
@@ -0,0 +1,142 @@
+# python -m benchmarks.backend_benchmark --time-limit 60 --workers 4 --output backend_benchmark.json
+
+import argparse
+import json
+import time
+from bigquery.optimize_bigquery_slots import solve_slots
+from optimize_gcs_storage import optimize_gcs_storage
+from schedule_queries import schedule_queries
+from vm_cost_optimization import optimize_vm_cost
+from solver_backends import BACKENDS, LP_ONLY_BACKENDS, normalize_backend
+from . import generators
+
+
+def _solve_dict(optimizer):
+    def run(instance, **options):
+        result = optimizer(**instance, **options)
+        if result is None:
+            return 'NOT_CREATED', None
+        return result['status'], result['total_cost']
+    return run
+
+
+# Problem class -> (instance generator, solve function, instance sizes).
+# Every class is a MIP. The slots and vm models have a fixed handful of
+# variables, so their sizes change the data, not the model, and their timings
+# mostly measure per-solve overhead.
+PROBLEMS = {
+    'slots': (generators.slot_instance, _solve_dict(solve_slots), [1, 10, 100]),
+    'storage': (generators.storage_instance, _solve_dict(optimize_gcs_storage), [10, 100, 1000]),
+    'schedule': (generators.schedule_instance, _solve_dict(schedule_queries), [3, 10, 30]),
+    'vm': (generators.vm_instance, _solve_dict(optimize_vm_cost), [100, 10000, 1000000]),
+}
+
+
+def run_benchmark(problems=None, backends=None, seed: int = 0, time_limit_s: float = 60,
+                  relative_gap: float = 0, num_workers: int = 0):
+    """
+    Solve the same generated instances on every backend and time them.
+
+    Args:
+        problems (list): Problem classes from `PROBLEMS`; defaults to all of them.
+        backends (list): Backends from `solver_backends.BACKENDS`; defaults to every
+            MIP backend. LP-only backends are rejected by the optimizers and reported
+            with a 'REJECTED' status.
+        seed (int): Seed for the instance generators.
+        time_limit_s (float): Per-solve time limit in seconds; 0 means no limit.
+        relative_gap (float): Relative MIP gap passed to every backend; 0 keeps the defaults.
+        num_workers (int): Solver threads; 0 keeps the backend defaults.
+
+    Returns:
+        list: One dict per (problem, size, backend) with 'status', 'objective',
+        'wall_time_s' and 'time_to_optimal_s' (None unless the solver proved optimality).
+    """
+    problems = problems or list(PROBLEMS)
+    backends = [normalize_backend(b) for b in (backends or [b for b in BACKENDS if b not in LP_ONLY_BACKENDS])]
+    results = []
+    for problem in problems:
+        generate, run, sizes = PROBLEMS[problem]
+        for size in sizes:
+            instance = generate(seed=seed, size=size)
+            for backend in backends:
+                started = time.perf_counter()
+                try:
+                    status, objective = run(instance, backend=backend, time_limit_s=time_limit_s,
+                                            relative_gap=relative_gap, num_workers=num_workers)
+                except ValueError:
+                    status, objective = 'REJECTED', None
+                except RuntimeError as e:
+                    status, objective = f'ERROR: {e}', None
+                wall_time = time.perf_counter() - started
+                results.append({
+                    'problem': problem,
+                    'size': size,
+                    'backend': backend,
+                    'status': status,
+                    'objective': objective,
+                    'wall_time_s': round(wall_time, 4),
+                    'time_to_optimal_s': round(wall_time, 4) if status == 'OPTIMAL' else None,
+                })
+    return results
+
+
+def fastest_backends(results, tolerance: float = 1e-6):
+    """
+    Pick the fastest backend per problem class.
+
+    A backend qualifies for a problem class only if it reached OPTIMAL with the best
+    objective (within `tolerance`, relative) on every size. Time-limited solves that
+    stopped at FEASIBLE do not qualify.
+
+    Returns:
+        dict: problem -> {'backend': ..., 'total_time_s': ...}, or None if no backend qualifies.
+    """
+    best = {}
+    for problem in {r['problem'] for r in results}:
+        rows = [r for r in results if r['problem'] == problem]
+        best_objective = {}
+        for r in rows:
+            if r['status'] == 'OPTIMAL':
+                size = r['size']
+                best_objective[size] = min(best_objective.get(size, r['objective']), r['objective'])
+        totals = {}
+        for backend in {r['backend'] for r in rows}:
+            backend_rows = [r for r in rows if r['backend'] == backend]
+            if all(r['status'] == 'OPTIMAL' and r['size'] in best_objective
+                   and abs(r['objective'] - best_objective[r['size']]) <= tolerance * max(1.0, abs(best_objective[r['size']]))
+                   for r in backend_rows):
+                totals[backend] = sum(r['wall_time_s'] for r in backend_rows)
+        if totals:
+            backend = min(totals, key=totals.get)
+            best[problem] = {'backend': backend, 'total_time_s': round(totals[backend], 4)}
+        else:
+            best[problem] = None
+    return best
+
+
+def print_report(results):
+    print(f"{'problem':<10} {'size':>8} {'backend':<8} {'status':<12} {'objective':>14} {'time (s)':>10}")
+    for r in results:
+        objective = '' if r['objective'] is None else f"{r['objective']:.4f}"
+        print(f"{r['problem']:<10} {r['size']:>8} {r['backend']:<8} {r['status'][:12]:<12} {objective:>14} {r['wall_time_s']:>10.4f}")
+    print('------------------------------------------------------------- ')
+    for problem, winner in sorted(fastest_backends(results).items()):
+        print(f"#### Fastest backend for {problem} :: {winner['backend'] if winner else 'none reached the optimum'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Solve generated instances on every solver backend.')
+    parser.add_argument('--problems', nargs='*', choices=list(PROBLEMS), help='Problem classes (default: all)')
+    parser.add_argument('--backends', nargs='*',
+                        help=f"Backends (default: {' '.join(b for b in BACKENDS if b not in LP_ONLY_BACKENDS)})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-limit', type=float, default=60, help='Per-solve time limit in seconds')
+    parser.add_argument('--gap', type=float, default=0, help='Relative MIP gap')
+    parser.add_argument('--workers', type=int, default=0, help='Solver threads')
+    parser.add_argument('--output', help='Write the raw results to this JSON file')
+    args = parser.parse_args()
+    results = run_benchmark(args.problems, args.backends, args.seed, args.time_limit, args.gap, args.workers)
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'results': results, 'fastest': fastest_backends(results)}, output_file, indent=4)
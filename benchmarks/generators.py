@@ -0,0 +1,263 @@
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+from optimize_gcs_storage import STORAGE_CLASSES
+
+
+def slot_instance(seed: int = 0, size: int = 1):
+    """
+    Generate inputs for `optimize_slots`.
+
+    Args:
+        seed (int): Random seed.
+        size (int): Scales the monthly query demand (TiB) and the slot cap.
+
+    Returns:
+        dict: Keyword arguments for `optimize_slots`.
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        'query_demand': round(float(rng.lognormal(np.log(100 * size), 0.5)), 2),
+        'max_slots': 50 * size,
+    }
+
+
+def storage_instance(seed: int = 0, size: int = 100):
+    """
+    Generate inputs for `optimize_gcs_storage` with `size` datasets.
+
+    Sizes and monthly retrievals are log-normal; about 20% of the datasets are
+    high-frequency. The budget is the cost of keeping everything in Standard, so
+    the instance is always feasible.
+
+    Returns:
+        dict: Keyword arguments for `optimize_gcs_storage`.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = rng.lognormal(np.log(500), 1.5, size).round(1)
+    accesses = (sizes * rng.lognormal(np.log(0.05), 1.5, size)).round(1)
+    high_freq = rng.random(size) < 0.2
+    datasets = [
+        {'size': float(s), 'access': float(a), 'high_freq': bool(h)}
+        for s, a, h in zip(sizes, accesses, high_freq)
+    ]
+    budget = float(sizes.sum() * STORAGE_CLASSES[0]['storage_cost']) + 1.0
+    return {'datasets': datasets, 'budget': budget}
+
+
+def schedule_instance(seed: int = 0, size: int = 10, load: float = 1.5):
+    """
+    Generate inputs for `schedule_queries` with `size` queries over a business day.
+
+    The flat-rate capacity is set so the queries ask for `load` times the
+    slot-hours it provides, so some queries have to go on-demand and the optimal
+    cost depends on the instance.
+
+    Returns:
+        dict: Keyword arguments for `schedule_queries`.
+    """
+    rng = np.random.default_rng((seed, size))
+    time_slots = 9
+    runtimes = rng.integers(1, 4, size)
+    slots_required = rng.integers(10, 80, size)
+    queries = [
+        {
+            'data_scanned': round(float(rng.lognormal(0, 1)), 2),
+            'slots_required': int(slots),
+            'runtime': int(runtime),
+            'deadline': int(rng.integers(runtime, time_slots + 1)),
+        }
+        for runtime, slots in zip(runtimes, slots_required)
+    ]
+    max_slots = int(max((runtimes * slots_required).sum() / (time_slots * load), slots_required.max()))
+    return {'queries': queries, 'time_slots': time_slots, 'max_slots': max_slots}
+
+
+def vm_instance(seed: int = 0, size: int = 100):
+    """
+    Generate inputs for `optimize_vm_cost` for a pool of `size` vCPUs.
+
+    Prices are drawn per (seed, size), so instances differ in whether the CUD and
+    the spot share pay off. The model has four variables whatever the size.
+
+    Returns:
+        dict: Keyword arguments for `optimize_vm_cost`.
+    """
+    rng = np.random.default_rng((seed, size))
+    return {
+        'total_vcpus': size,
+        'max_spot_vcpus': int(size * rng.uniform(0.2, 0.6)),
+        'standard_cost': round(float(rng.uniform(0.03, 0.05)), 4),
+        'cud_discount': round(float(rng.uniform(0.0, 0.02)), 4),
+        'spot_cost': round(float(rng.uniform(0.008, 0.06)), 4),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Ingestion workloads. These stand in for the rows, blobs and log entries the
+# GCP clients return, so every ingestion path can be exercised offline. They
+# are generated in chunks of plain Python objects so 1e7-row runs fit in memory.
+# ---------------------------------------------------------------------------
+
+# Attribute names match the BigQuery INFORMATION_SCHEMA.JOBS columns
+JobRow = namedtuple('JobRow', ['creation_time', 'job_type', 'state', 'total_slot_ms',
+                               'total_bytes_processed', 'user_email', 'query'])
+# Attribute names match google.cloud.storage.Blob
+Blob = namedtuple('Blob', ['name', 'size', 'storage_class'])
+# Attribute names match google.cloud.logging entries
+LogEntry = namedtuple('LogEntry', ['timestamp', 'payload'])
+
+# Recurring query shapes; the literals change between runs
+QUERY_TEMPLATES = [
+    "SELECT * FROM `analytics.events` WHERE event_date = '{date}' AND country = '{country}'",
+    "SELECT user_id, COUNT(*) FROM `analytics.events` WHERE event_date >= '{date}' GROUP BY user_id",
+    "SELECT SUM(amount) FROM `billing.invoices` WHERE customer_id = {id} AND year = {year}",
+    "select order_id, status from `sales.orders` where order_id in ({id}, {id2}) limit {limit}",
+    "SELECT * FROM `sales.orders` o JOIN `sales.customers` c ON o.customer_id = c.id WHERE c.region = '{country}'",
+    "SELECT DATE(ts) AS d, AVG(latency_ms) FROM `ops.requests` WHERE ts > TIMESTAMP('{date}') GROUP BY d",
+    "SELECT product_id, SUM(qty) FROM `sales.order_items` WHERE created_at BETWEEN '{date}' AND '{date}' GROUP BY 1",
+    "SELECT * FROM `ml.features` WHERE model_version = {year} AND score > {score}",
+]
+COUNTRIES = ['US', 'DE', 'IN', 'BR', 'JP', 'FR', 'GB', 'CA']
+
+# Share of jobs submitted in each hour of the day (office-hours peak)
+HOURLY_PROFILE = np.array([1, 1, 1, 1, 1, 2, 3, 5, 8, 9, 9, 8, 7, 8, 9, 9, 8, 6, 4, 3, 2, 2, 1, 1], dtype=float)
+HOURLY_PROFILE /= HOURLY_PROFILE.sum()
+
+
+def _chunks(n, chunk_size):
+    for start in range(0, n, chunk_size):
+        yield start, min(chunk_size, n - start)
+
+
+def job_history(seed: int = 0, n: int = 1000, days: int = 30, chunk_size: int = 100000,
+                start: datetime = datetime(2025, 1, 1)):
+    """
+    Generate `n` BigQuery jobs spread over `days` days, in chunks.
+
+    Arrivals follow `HOURLY_PROFILE`, slot-ms and bytes are heavy-tailed
+    (log-normal), about 90% of jobs are queries, 3% fail, and query texts come from
+    `QUERY_TEMPLATES` with a Zipf-like popularity so a few shapes dominate the bill.
+
+    Yields:
+        list: Up to `chunk_size` `JobRow`s, sorted by creation_time within the chunk.
+    """
+    rng = np.random.default_rng(seed)
+    num_users = max(int(np.sqrt(n)), 1)
+    template_weights = 1.0 / np.arange(1, len(QUERY_TEMPLATES) + 1)
+    template_weights /= template_weights.sum()
+    start_ts = start.timestamp()
+    for _, size in _chunks(n, chunk_size):
+        day = rng.integers(0, days, size)
+        hour = rng.choice(24, size, p=HOURLY_PROFILE)
+        creation = np.sort(start_ts + day * 86400 + hour * 3600 + rng.uniform(0, 3600, size)).tolist()
+        job_type = rng.choice(['QUERY', 'LOAD', 'COPY'], size, p=[0.9, 0.05, 0.05]).tolist()
+        failed = (rng.random(size) < 0.03).tolist()
+        slot_ms = rng.lognormal(np.log(20000), 2.0, size).astype(np.int64).tolist()
+        bytes_processed = rng.lognormal(np.log(2e9), 2.0, size).astype(np.int64).tolist()
+        users = rng.integers(0, num_users, size).tolist()
+        templates = rng.choice(len(QUERY_TEMPLATES), size, p=template_weights).tolist()
+        literals = rng.integers(1, 100000, size).tolist()
+        rows = []
+        for i in range(size):
+            literal = literals[i]
+            query = QUERY_TEMPLATES[templates[i]].format(
+                date=f'2025-01-{literal % 28 + 1:02d}', country=COUNTRIES[literal % len(COUNTRIES)],
+                id=literal, id2=literal + 1, year=2020 + literal % 6,
+                limit=literal % 1000, score=round(literal / 100000, 3),
+            )
+            rows.append(JobRow(
+                creation_time=datetime.fromtimestamp(creation[i]),
+                job_type=job_type[i],
+                state='FAILED' if failed[i] else 'DONE',
+                total_slot_ms=None if failed[i] and literal % 2 else slot_ms[i],
+                total_bytes_processed=0 if failed[i] else bytes_processed[i],
+                user_email=f'user{users[i]}@example.com',
+                query=query,
+            ))
+        yield rows
+
+
+def job_arrays(seed: int = 0, n: int = 1000, days: int = 30):
+    """
+    Generate `n` query jobs over `days` days as arrays for the slot simulator.
+
+    Arrivals follow `HOURLY_PROFILE`; slot-ms is log-normal like `job_history`, and
+    peak parallelism grows with the job's size (small jobs use a handful of slots,
+    large ones up to a few thousand).
+
+    Returns:
+        dict: 'arrival_s', 'slot_ms' and 'max_parallelism' arrays
+        (see `bigquery.slot_simulator.jobs_from_rows`).
+    """
+    rng = np.random.default_rng(seed)
+    day = rng.integers(0, days, n)
+    hour = rng.choice(24, n, p=HOURLY_PROFILE)
+    arrival = day * 86400 + hour * 3600 + rng.uniform(0, 3600, n)
+    slot_ms = rng.lognormal(np.log(20000), 2.0, n)
+    parallelism = np.clip(np.sqrt(slot_ms / 1000) * rng.lognormal(0, 0.5, n), 1, 2000).round()
+    return {'arrival_s': arrival, 'slot_ms': slot_ms, 'max_parallelism': parallelism}
+
+
+def object_inventory(seed: int = 0, n: int = 1000, chunk_size: int = 100000, objects_per_prefix: int = 100):
+    """
+    Generate a listing of `n` GCS objects grouped under prefixes, in chunks.
+
+    Object sizes are log-normal (median ~64 MiB). Objects are named
+    `dataset-<k>/part-<i>.parquet` with about `objects_per_prefix` objects per
+    prefix, so prefixes can be treated as datasets by the storage optimizer.
+
+    Yields:
+        list: Up to `chunk_size` `Blob`s.
+    """
+    rng = np.random.default_rng(seed)
+    for offset, size in _chunks(n, chunk_size):
+        sizes = rng.lognormal(np.log(64 * 1024 ** 2), 1.5, size).astype(np.int64).tolist()
+        yield [
+            Blob(name=f'dataset-{(offset + i) // objects_per_prefix:06d}/part-{offset + i:08d}.parquet',
+                 size=sizes[i], storage_class='STANDARD')
+            for i in range(size)
+        ]
+
+
+def access_logs(seed: int = 0, n: int = 1000, num_objects: int = 1000, bucket: str = 'bench-bucket',
+                chunk_size: int = 100000, objects_per_prefix: int = 100):
+    """
+    Generate `n` storage.objects.get audit log entries over `num_objects` objects, in chunks.
+
+    Object popularity is Zipf-distributed, matching the objects of `object_inventory`.
+
+    Yields:
+        list: Up to `chunk_size` `LogEntry`s.
+    """
+    rng = np.random.default_rng(seed)
+    for _, size in _chunks(n, chunk_size):
+        objects = ((rng.zipf(1.3, size) - 1) % num_objects).tolist()
+        yield [
+            LogEntry(timestamp=None, payload={
+                'methodName': 'storage.objects.get',
+                'resourceName': f'projects/_/buckets/{bucket}/objects/'
+                                f'dataset-{o // objects_per_prefix:06d}/part-{o:08d}.parquet',
+            })
+            for o in objects
+        ]
+
+
+def vm_demand_curves(seed: int = 0, num_groups: int = 10, hours: int = 24 * 28):
+    """
+    Generate hourly vCPU demand for `num_groups` instance groups.
+
+    Each curve has a group-specific base level, a daily and a weekly cycle, a small
+    linear trend and log-normal noise.
+
+    Returns:
+        np.ndarray: Array of shape (num_groups, hours) with vCPU demand.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(hours)
+    base = rng.lognormal(np.log(100), 1.0, (num_groups, 1))
+    daily = 1 + 0.4 * np.sin(2 * np.pi * (t % 24 - 8) / 24)
+    weekly = np.where((t // 24) % 7 >= 5, 0.6, 1.0)
+    trend = 1 + rng.uniform(-0.1, 0.3, (num_groups, 1)) * t / hours
+    noise = rng.lognormal(0, 0.1, (num_groups, hours))
+    return base * daily * weekly * trend * noise
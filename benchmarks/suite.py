@@ -0,0 +1,326 @@
+# python -m benchmarks.suite --scales 1e3 1e4 1e5
+# python -m benchmarks.suite --scales 1e3 1e4 1e5 1e6 1e7 --save-baseline
+
+import argparse
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from bigquery.optimize_bigquery_slots import optimize_slots
+from bigquery.query_attribution import QueryAttribution
+from bigquery.slot_simulator import simulate_reservation
+from bigquery.slot_utilization_gemini import aggregate_slot_usage
+from dataset_metadata import to_data_points
+from demand_forecast import forecast_vm_pools
+from optimize_gcs_storage import STORAGE_CLASSES, optimize_gcs_storage
+from query_gcs_access_logs import count_accesses
+from schedule_queries import schedule_queries
+from vm_cost_optimization import optimize_vm_cost
+import solver_telemetry
+from . import generators
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+METRICS = ('ingest_s', 'build_s', 'solve_s', 'peak_mb')
+
+# Solver spans of the current measurement (build/solve wall times are read from them)
+_spans = InMemorySpanExporter()
+_spans_registered = False
+
+
+class Timer:
+    """
+    Accumulates wall time over several `with timer:` blocks.
+    """
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._started
+
+
+def _solver_phases():
+    """
+    Sum build/solve wall time (seconds) over the solver spans recorded since the last call.
+    """
+    build_ms = solve_ms = 0.0
+    for span in _spans.get_finished_spans():
+        build_ms += span.attributes.get('build.wall_time_ms', 0.0)
+        solve_ms += span.attributes.get('solve.wall_time_ms', 0.0)
+    _spans.clear()
+    return build_ms / 1000, solve_ms / 1000
+
+
+# Every benchmark takes (scale, seed, max_model_size), ingests `scale` generated
+# records where the module has an ingestion path, then builds and solves its model.
+# It returns (ingest Timer, model size); build/solve times come from the spans.
+
+def bench_slots(scale, seed, max_model_size):
+    """
+    Job history -> aggregate_slot_usage -> optimize_slots on the processed TiB.
+    """
+    ingest = Timer()
+    total_bytes = 0
+    for rows in generators.job_history(seed=seed, n=scale):
+        with ingest:
+            aggregate_slot_usage(rows)
+        total_bytes += sum(row.total_bytes_processed for row in rows if row.state == 'DONE' and row.job_type == 'QUERY')
+    query_demand = round(total_bytes / 1024 ** 4, 2)
+    optimize_slots(query_demand, max_slots=max(50, int(query_demand)))
+    return ingest, 2
+
+
+def bench_attribution(scale, seed, max_model_size):
+    """
+    Job history -> QueryAttribution (fingerprinting and per-shape/per-user aggregation).
+    """
+    ingest = Timer()
+    attribution = QueryAttribution()
+    for rows in generators.job_history(seed=seed, n=scale):
+        with ingest:
+            attribution.update(rows)
+    with ingest:
+        attribution.summary()
+    return ingest, 0
+
+
+def bench_simulator(scale, seed, max_model_size):
+    """
+    Job arrays -> simulate_reservation with a baseline at the average slot demand.
+    """
+    ingest = Timer()
+    jobs = generators.job_arrays(seed=seed, n=scale)
+    average_slots = jobs['slot_ms'].sum() / 1000 / max(jobs['arrival_s'].max(), 1.0)
+    with ingest:
+        simulate_reservation(jobs['arrival_s'], jobs['slot_ms'], jobs['max_parallelism'],
+                             baseline_slots=max(int(average_slots), 1), autoscale_max_slots=100)
+    return ingest, 0
+
+
+def bench_storage(scale, seed, max_model_size):
+    """
+    Object inventory + access logs -> to_data_points / count_accesses -> optimize_gcs_storage per prefix.
+    """
+    ingest = Timer()
+    datasets = {}
+    for blobs in generators.object_inventory(seed=seed, n=scale):
+        with ingest:
+            data_points = to_data_points(blobs)
+        for point in data_points:
+            dataset = datasets.setdefault(point['name'].split('/', 1)[0], {'size': 0.0, 'access': 0.0})
+            dataset['size'] += point['size_gb']
+    for entries in generators.access_logs(seed=seed, n=scale, num_objects=scale):
+        with ingest:
+            counts = count_accesses(entries)
+        for resource_name, count in counts.items():
+            prefix = resource_name.split('/objects/', 1)[1].split('/', 1)[0]
+            # Assume each read retrieves one average-sized object of the dataset
+            # (object_inventory puts 100 objects under each prefix)
+            datasets[prefix]['access'] += count * datasets[prefix]['size'] / 100
+    model_datasets = [
+        {'size': d['size'], 'access': d['access'], 'high_freq': d['access'] > d['size']}
+        for d in list(datasets.values())[:max_model_size]
+    ]
+    # Loose enough for any assignment: every dataset at the highest storage and retrieval prices
+    budget = (sum(d['size'] for d in model_datasets) * max(c['storage_cost'] for c in STORAGE_CLASSES)
+              + sum(d['access'] for d in model_datasets) * max(c['retrieval_cost'] for c in STORAGE_CLASSES))
+    optimize_gcs_storage(model_datasets, budget=budget)
+    return ingest, len(model_datasets)
+
+
+def bench_vm(scale, seed, max_model_size):
+    """
+    Hourly vCPU demand curves -> peak pool size and spot share -> optimize_vm_cost.
+    """
+    ingest = Timer()
+    hours = 24 * 28
+    curves = generators.vm_demand_curves(seed=seed, num_groups=max(scale // hours, 1), hours=hours)
+    with ingest:
+        pool_size = int(curves.sum(axis=0).max())
+        spot_share = float((curves.sum(axis=0) <= pool_size * 0.5).mean())
+    optimize_vm_cost(total_vcpus=pool_size, max_spot_vcpus=int(pool_size * max(spot_share, 0.2)))
+    return ingest, 4
+
+
+def bench_forecast(scale, seed, max_model_size):
+    """
+    Hourly vCPU curves of `scale` / 100 instance groups -> forecast_vm_pools -> optimize_vm_cost per pool.
+    """
+    ingest = Timer()
+    curves = generators.vm_demand_curves(seed=seed, num_groups=max(scale // 100, 1), hours=24 * 28)
+    with ingest:
+        pools = forecast_vm_pools(curves)
+    for pool in pools[:max(max_model_size // 1000, 1)]:
+        optimize_vm_cost(**pool)
+    return ingest, len(pools)
+
+
+def bench_schedule(scale, seed, max_model_size):
+    """
+    Query batch -> schedule_queries (the model grows with the number of queries).
+
+    Generated instances oversubscribe the flat-rate slots, which makes large ones
+    hard to prove optimal, so the solve is capped at 10 seconds.
+    """
+    num_queries = min(scale, max(max_model_size // 100, 3))
+    schedule_queries(**generators.schedule_instance(seed=seed, size=num_queries), time_limit_s=10)
+    return Timer(), num_queries
+
+
+BENCHMARKS = {
+    'slots': bench_slots,
+    'attribution': bench_attribution,
+    'simulator': bench_simulator,
+    'storage': bench_storage,
+    'vm': bench_vm,
+    'forecast': bench_forecast,
+    'schedule': bench_schedule,
+}
+
+
+def run_suite(scales, benchmarks=None, seed: int = 0, repeat: int = 1, max_model_size: int = 10000,
+              measure_memory: bool = True):
+    """
+    Run every benchmark at every scale, fully offline.
+
+    Each (benchmark, scale) pair runs `repeat` times and keeps the fastest time per
+    phase. Peak memory is measured in a separate run under `tracemalloc`, so tracing
+    overhead does not leak into the timings. It only covers Python allocations,
+    not memory allocated inside the OR-Tools solvers.
+
+    Args:
+        scales (list): Number of generated records per run, e.g. [1000, 10000].
+        benchmarks (list): Names from `BENCHMARKS`; defaults to all.
+        seed (int): Seed for the generators.
+        repeat (int): Timed runs per pair.
+        max_model_size (int): Caps the number of datasets/queries handed to a solver,
+            so large scales exercise ingestion without building huge models.
+        measure_memory (bool): Also record peak traced memory.
+
+    Returns:
+        dict: '<benchmark>@<scale>' -> {'ingest_s', 'build_s', 'solve_s', 'peak_mb', 'model_size'}.
+    """
+    global _spans_registered
+    if not _spans_registered:
+        # Once per process; every registered processor would export each span again
+        solver_telemetry.add_span_processor(SimpleSpanProcessor(_spans))
+        _spans_registered = True
+    results = {}
+    for name in benchmarks or BENCHMARKS:
+        bench = BENCHMARKS[name]
+        for scale in scales:
+            best = {}
+            for _ in range(repeat):
+                gc.collect()
+                _spans.clear()
+                ingest, model_size = bench(scale, seed, max_model_size)
+                build_s, solve_s = _solver_phases()
+                for metric, value in (('ingest_s', ingest.seconds), ('build_s', build_s), ('solve_s', solve_s)):
+                    best[metric] = min(best.get(metric, value), value)
+            result = {metric: round(value, 4) for metric, value in best.items()}
+            result['model_size'] = model_size
+            if measure_memory:
+                gc.collect()
+                tracemalloc.start()
+                bench(scale, seed, max_model_size)
+                result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 2)
+                tracemalloc.stop()
+                _spans.clear()
+            results[f'{name}@{scale}'] = result
+            print(f'#### {name}@{scale} :: {json.dumps(result)}')
+    return results
+
+
+def compare(results, baseline, tolerance: float = 0.25, min_delta_s: float = 0.005, min_delta_mb: float = 1.0):
+    """
+    Compare a run with the baseline.
+
+    A metric regresses when it is more than `tolerance` (relative) above the
+    baseline and the absolute difference exceeds `min_delta_s` / `min_delta_mb`,
+    which keeps timer noise on tiny runs from being reported.
+
+    Returns:
+        list: One dict per compared metric with 'key', 'metric', 'baseline',
+        'current', 'ratio' and 'regression'.
+    """
+    rows = []
+    for key, result in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous:
+            continue
+        for metric in METRICS:
+            if metric not in result or metric not in previous:
+                continue
+            current, before = result[metric], previous[metric]
+            min_delta = min_delta_mb if metric == 'peak_mb' else min_delta_s
+            ratio = current / before if before else None
+            rows.append({
+                'key': key,
+                'metric': metric,
+                'baseline': before,
+                'current': current,
+                'ratio': round(ratio, 2) if ratio is not None else None,
+                'regression': current - before > min_delta and (ratio is None or ratio > 1 + tolerance),
+            })
+    return rows
+
+
+def load_baseline(path: str = BASELINE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(results, path: str = BASELINE_FILE):
+    baseline = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'results': results,
+    }
+    with open(path, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=4)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Offline benchmark suite for the optimizers and ingestion paths.')
+    parser.add_argument('--scales', nargs='*', type=float, default=[1e3, 1e4, 1e5],
+                        help='Records per run (1e3 .. 1e7)')
+    parser.add_argument('--only', nargs='*', choices=list(BENCHMARKS), help='Benchmarks to run (default: all)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='Timed runs per benchmark and scale')
+    parser.add_argument('--max-model-size', type=int, default=10000,
+                        help='Cap on datasets/queries passed to a solver')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak-memory run')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on regressions')
+    args = parser.parse_args()
+
+    results = run_suite([int(s) for s in args.scales], args.only, args.seed, args.repeat,
+                        args.max_model_size, not args.no_memory)
+    print('------------------------------------------------------------- ')
+    regressions = []
+    baseline = load_baseline(args.baseline)
+    if baseline:
+        for row in compare(results, baseline, args.tolerance):
+            flag = 'REGRESSION' if row['regression'] else ''
+            print(f"{row['key']:<22} {row['metric']:<9} {row['baseline']:>10} -> {row['current']:>10} "
+                  f"x{row['ratio']} {flag}")
+            if row['regression']:
+                regressions.append(row)
+    else:
+        print(f'#### No baseline at {args.baseline}; run with --save-baseline to create one')
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f'#### Baseline saved to {args.baseline}')
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
@@ -1,42 +1,47 @@
-from google.cloud import bigquery
-from google.oauth2 import service_account
-from config import SERVICE_ACCOUNT_KEY
+import logging
+from config import PROJECT_ID, REGION
+from gcp_clients import bigquery_client
+from .data_cache import cached
 
-# Create credentials object
-credentials = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_KEY)
-client = bigquery.Client(credentials=credentials)
+logger = logging.getLogger(__name__)
 
-def get_query_demand():
+@cached()
+def get_query_demand(project_id: str = PROJECT_ID, region: str = REGION):
     """
     Fetches the total amount of data processed in BigQuery queries for the last 30 days in tebibytes (TiB).
 
     The function runs a SQL query against the INFORMATION_SCHEMA.JOBS_BY_PROJECT view 
-    scoped to the US region to sum the `total_bytes_processed` for all completed (`state = 'DONE'`) 
+    scoped to the project's region to sum the `total_bytes_processed` for all completed (`state = 'DONE'`) 
     query jobs executed in the past 30 days.
 
+    Args:
+        project_id (str): The ID of the Google Cloud project to analyze.
+        region (str): The BigQuery region of the project's jobs, e.g. 'us'.
+
     Returns:
         float: Total data processed by queries in the last 30 days, expressed in tebibytes (TiB).
     
     Side effects:
-        Prints the total TiB processed in last 30 days formatted to 4 decimal places.
+        Logs the total TiB processed in last 30 days.
+        The result is cached (see `data_cache.cached`) so repeated calls reuse one snapshot.
     """
 
-    query = """
+    query = f"""
     SELECT
     SUM(total_bytes_processed)/POWER(1024,4) AS total_tib_processed
     FROM
-    `region-US`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
+    `{project_id}`.`region-{region}`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
     WHERE
     creation_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
     AND state = 'DONE'
     AND job_type = 'QUERY'
     """
-    query_job = client.query(query)
+    query_job = bigquery_client(project_id).query(query)
     result = query_job.result()
     for row in result:
         query_demand = round(float(row.total_tib_processed), 2)
-    print(f'#### Last 30 days TiB processed ::  {query_demand}')
-    print('------------------------------------------------------------- ')
+    logger.info('Last 30 days TiB processed',
+                extra={'data': {'project_id': project_id, 'region': region, 'query_demand': query_demand}})
     return query_demand
 
 #get_query_demand()
\ No newline at end of file
@@ -1,4 +1,24 @@
-import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cost per TB of data processed using on-demand pricing per region (approximate; varies slightly)
+# As of 2024, typical on-demand cost is $5 or $6.25 per TB depending on region and data type
+ON_DEMAND_COST_PER_TB_BY_REGION = {
+    'us': 6.25,   # US region on-demand cost per TB
+    'eu': 7.00,   # Example EU region cost, may vary
+    # Add more regions and costs if needed
+}
+
+# Cost per slot-hour for flat-rate pricing
+# This is approximate; flat-rate slots cost around $40 per slot per month;
+# Monthly cost per slot ~ $40 so hourly ~$0.055 (40 / (24*30))
+# We use hourly slot cost to multiply by hours of usage
+FLAT_RATE_SLOT_HOURLY_COST = 0.055  # USD per slot-hour approx
+
+# Cost per slot-hour of autoscaled (pay-as-you-go, Enterprise edition) slots,
+# billed only while the autoscaler holds them
+AUTOSCALE_SLOT_HOURLY_COST = 0.06  # USD per slot-hour approx
 
 def calculate_bigquery_cost(
     region,
@@ -19,22 +39,9 @@ def calculate_bigquery_cost(
         dict: Cost breakdown and total cost in USD.
     """
 
-    # Cost per TB of data processed using on-demand pricing per region (approximate; varies slightly)
-    # As of 2024, typical on-demand cost is $5 or $6.25 per TB depending on region and data type
-    on_demand_cost_per_tb_by_region = {
-        'us': 6.25,   # US region on-demand cost per TB
-        'eu': 7.00,   # Example EU region cost, may vary
-        # Add more regions and costs if needed
-    }
-
-    # Cost per slot-hour for flat-rate pricing
-    # This is approximate; flat-rate slots cost around $40 per slot per month; 
-    # Monthly cost per slot ~ $40 so hourly ~$0.055 (40 / (24*30))
-    # We use hourly slot cost to multiply by hours of usage
-    flat_rate_slot_hourly_cost = 0.055  # USD per slot-hour approx
-
     # Get on-demand cost per TB for the requested region, default to US if unknown
-    on_demand_cost_per_tb = on_demand_cost_per_tb_by_region.get(region.lower(), 6.25)
+    on_demand_cost_per_tb = ON_DEMAND_COST_PER_TB_BY_REGION.get(region.lower(), 6.25)
+    flat_rate_slot_hourly_cost = FLAT_RATE_SLOT_HOURLY_COST
 
     # Calculate costs
     on_demand_cost = bytes_processed_tb * on_demand_cost_per_tb
@@ -54,8 +61,7 @@ def calculate_bigquery_cost(
         'total_cost': round(float(total_cost.solution_value()), 2)
     }
     
-    print('#### Bigquery Cost Result :: ', json.dumps(result, indent=4))
-    print('------------------------------------------------------------- ')
+    logger.info('BigQuery cost result', extra={'data': result})
     return result
 
 
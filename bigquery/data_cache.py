@@ -0,0 +1,133 @@
+import contextlib
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import DATA_CACHE_TTL_SECONDS
+
+# Shared in-process snapshot of the data-gathering tools.
+# Key: (function name, bound arguments) -> (expires_at, value)
+_cache = {}
+_lock = threading.Lock()
+# One lock per key so concurrent callers of the same tool wait for a single fetch.
+# Key -> [lock, callers holding or waiting for it]; dropped when the last caller leaves.
+_key_locks = {}
+# Open `pinned()` contexts; while any is open, cached values do not expire
+_pins = 0
+
+
+def _acquire_key_lock(key):
+    with _lock:
+        # Expired values are evicted here; their key locks are already gone
+        now = time.monotonic()
+        if not _pins:
+            for expired in [k for k, (expires_at, _) in _cache.items() if expires_at <= now]:
+                del _cache[expired]
+        entry = _key_locks.get(key)
+        if entry is None:
+            entry = _key_locks[key] = [threading.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def _release_key_lock(key):
+    with _lock:
+        entry = _key_locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _key_locks[key]
+
+
+def cached(ttl_seconds: float = DATA_CACHE_TTL_SECONDS):
+    """
+    Cache the result of a data-gathering function for `ttl_seconds`.
+
+    Concurrent calls with the same arguments share a single underlying fetch,
+    so a batch of prompts hitting the same tool only queries BigQuery once.
+    Empty results (e.g. `{}` returned after a failed query) are not cached so
+    that the next call retries.
+
+    Args:
+        ttl_seconds (float): How long a cached value stays valid, in seconds.
+
+    Returns:
+        Callable: Decorator that keeps the wrapped function's name, signature
+        and docstring (the agent builds its tool declarations from them).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Bind with defaults so f(30), f(days_back=30) and f() share one entry
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__qualname__, tuple(bound.arguments.items()))
+            key_lock = _acquire_key_lock(key)
+            try:
+                with key_lock:
+                    entry = _cache.get(key)
+                    if entry and (_pins or entry[0] > time.monotonic()):
+                        return entry[1]
+                    value = func(*args, **kwargs)
+                    if value or value == 0:
+                        with _lock:
+                            _cache[key] = (time.monotonic() + ttl_seconds, value)
+                    return value
+            finally:
+                _release_key_lock(key)
+        return wrapper
+    return decorator
+
+
+def clear_cache():
+    """
+    Drop every cached value so the next call of each tool fetches fresh data.
+    """
+    with _lock:
+        _cache.clear()
+
+
+@contextlib.contextmanager
+def pinned():
+    """
+    Keep every cached value valid, whatever its TTL, until the context exits.
+
+    A batch that outlives the TTL would otherwise refetch halfway through and
+    answer its prompts from different data. Values cached inside the context
+    are pinned as well.
+    """
+    global _pins
+    with _lock:
+        _pins += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _pins -= 1
+
+
+def warm_snapshot(days_back: int = 30):
+    """
+    Fetch the data points used by the agent tools in parallel and cache them.
+
+    Call this once before running a batch of prompts, inside `pinned()`, so every
+    prompt in the batch is answered from the same data snapshot.
+
+    Args:
+        days_back (int): Number of days of slot utilization history to load.
+
+    Returns:
+        dict: The cached 'query_demand' and 'slot_utilization' values.
+    """
+    from .bigquery_byte_scanned import get_query_demand
+    from .slot_utilization_gemini import get_bigquery_slot_utilization_for_project
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        query_demand = pool.submit(get_query_demand)
+        slot_utilization = pool.submit(get_bigquery_slot_utilization_for_project, days_back)
+        return {
+            'query_demand': query_demand.result(),
+            'slot_utilization': slot_utilization.result(),
+        }
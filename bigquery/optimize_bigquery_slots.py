@@ -1,11 +1,16 @@
 # python -m agent.bigquery_cost_optimizer_agent
 
 # Step 1 : Import the linear solver wrapper,
+import logging
 from ortools.linear_solver import pywraplp
-from .bigquery_byte_scanned import get_query_demand
 from .bigquery_cost_calculator import calculate_bigquery_cost
+from solver_telemetry import MPSOLVER_STATUS, build_phase, solve
+from solver_backends import create_solver, solver_parameters
 
-def optimize_slots(query_demand: float, max_slots: int=50):
+logger = logging.getLogger(__name__)
+
+def optimize_slots(query_demand: float, max_slots: int=50, backend: str='CBC', time_limit_s: float=0.0,
+                   relative_gap: float=0.0, num_workers: int=0):
     """
     Optimize the allocation between reserved BigQuery slots and on-demand bytes processed to minimize cost.
 
@@ -20,6 +25,10 @@ def optimize_slots(query_demand: float, max_slots: int=50):
     Args:
         query_demand (float): Total BigQuery query demand expressed in tebibytes (TiB) of processed data.
         max_slots (int, optional): Maximum number of reserved slots allowed in the optimization. Default is 50.
+        backend (str, optional): MIP solver backend: 'SCIP', 'CBC', 'CP-SAT' or 'HIGHS'. Default is 'CBC'.
+        time_limit_s (float, optional): Solver time limit in seconds; 0 means no limit.
+        relative_gap (float, optional): Relative MIP gap at which to stop; 0 keeps the solver default.
+        num_workers (int, optional): Solver threads; 0 keeps the solver default.
 
     Returns:
         tuple:
@@ -29,45 +38,79 @@ def optimize_slots(query_demand: float, max_slots: int=50):
     Notes:
         - Assumes approximately 100 slots are needed to process 1 TiB of data.
         - Assumes monthly usage duration of 24 * 30 hours for slot cost calculation.
-        - Uses CBC solver from Google OR-Tools for Mixed-Integer Programming.
+        - Uses the CBC solver from Google OR-Tools for Mixed-Integer Programming unless `backend` says otherwise.
         - The region is hardcoded to 'us' for pricing purposes; adjust as necessary for other regions.
         - The cost parameters (`flat_rate_slot_hourly_cost`, `on_demand_cost_per_tb`) are obtained
           from a `calculate_bigquery_cost` helper function, which must be defined separately.
 
     Raises:
-        RuntimeError: If the solver fails to find an optimal solution.
+        RuntimeError: If the solver cannot be created or fails to find a solution.
+        ValueError: If `backend` is unknown or LP-only.
+    """
+    result = solve_slots(query_demand, max_slots, backend, time_limit_s, relative_gap, num_workers)
+    if result['status'] not in ('OPTIMAL', 'FEASIBLE'):
+        raise RuntimeError(f"optimize_slots: solver did not find a solution (status {result['status']})")
+    return result['reserved_slots'], result['on_demand_tib']
+
+
+def solve_slots(query_demand: float, max_slots: int=50, backend: str='CBC', time_limit_s: float=0.0,
+                relative_gap: float=0.0, num_workers: int=0):
     """
+    Solve the `optimize_slots` model and report the solver status with the solution.
+
+    A time-limited solve can stop at a FEASIBLE solution; callers that compare
+    backends (see `benchmarks.backend_benchmark`) need to tell it from OPTIMAL.
 
+    Returns:
+        dict: 'status' (a `solver_telemetry.MPSOLVER_STATUS` name), 'reserved_slots',
+        'on_demand_tib' and 'total_cost' ($/month); the last three are None
+        without a solution.
+
+    Raises:
+        RuntimeError: If this OR-Tools build lacks the backend.
+        ValueError: If `backend` is unknown or LP-only.
+    """
     # Step 2 : declare the MIP solver
-    solver = pywraplp.Solver.CreateSolver('CBC')
-    # Step 3 : define the variables
-    on_demand_tib = solver.NumVar(0, solver.infinity(), 'on_demand_tib')
-    region = 'us'                  # The region your BigQuery datasets reside in
-    tb_processed = query_demand    # Total TB processed in on-demand pricing
-    reserved_slots = solver.IntVar(0, max_slots, 'reserved_slots')     # Number of flat-rate slots reserved
-    hours_per_month = 24 * 30      # Assuming reserved slots are used all month
-
-    cost_details = calculate_bigquery_cost(region, tb_processed, reserved_slots, hours_per_month)
-
-    # Costs
-    slot_cost = float(cost_details['flat_rate_slot_hourly_cost'])  # $/slot-hour
-    on_demand_cost = cost_details['on_demand_cost_per_tb']  # $/TiB
-    slots_per_tib = 100  # Approx. slots needed per TiB processed
-    # Step 4 : define the constraints
-    # Constraint: Meet query demand
-    solver.Add(reserved_slots * slots_per_tib + on_demand_tib >= query_demand)
-    # Step 5: define the objective Objective: Minimize cost
-    objective = solver.Objective()
-    objective.SetCoefficient(reserved_slots, slot_cost * 24 * 30)  # Monthly cost
-    objective.SetCoefficient(on_demand_tib, on_demand_cost)
-    objective.SetMinimization()
+    solver = create_solver(backend, time_limit_s, num_workers)
+    if not solver:
+        raise RuntimeError(f'optimize_slots: solver backend {backend} is not available')
+    with build_phase('optimize_slots', solver):
+        # Step 3 : define the variables
+        on_demand_tib = solver.NumVar(0, solver.infinity(), 'on_demand_tib')
+        region = 'us'                  # The region your BigQuery datasets reside in
+        tb_processed = query_demand    # Total TB processed in on-demand pricing
+        reserved_slots = solver.IntVar(0, max_slots, 'reserved_slots')     # Number of flat-rate slots reserved
+        hours_per_month = 24 * 30      # Assuming reserved slots are used all month
+
+        cost_details = calculate_bigquery_cost(region, tb_processed, reserved_slots, hours_per_month)
+
+        # Costs
+        slot_cost = float(cost_details['flat_rate_slot_hourly_cost'])  # $/slot-hour
+        on_demand_cost = cost_details['on_demand_cost_per_tb']  # $/TiB
+        slots_per_tib = 100  # Approx. slots needed per TiB processed
+        # Step 4 : define the constraints
+        # Constraint: Meet query demand
+        solver.Add(reserved_slots * slots_per_tib + on_demand_tib >= query_demand)
+        # Step 5: define the objective Objective: Minimize cost
+        objective = solver.Objective()
+        objective.SetCoefficient(reserved_slots, slot_cost * 24 * 30)  # Monthly cost
+        objective.SetCoefficient(on_demand_tib, on_demand_cost)
+        objective.SetMinimization()
     # Step 6 : call the MIP solver
-    solver.Solve()
+    status = solve('optimize_slots', solver, solver_parameters(relative_gap), backend)
+    # FEASIBLE: stopped early by time_limit_s / relative_gap with a usable solution
+    if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        return {'status': MPSOLVER_STATUS.get(status, str(status)), 'reserved_slots': None,
+                'on_demand_tib': None, 'total_cost': None}
     # Step 7: return the solution
-    reserved = reserved_slots.solution_value()
-    on_demand = on_demand_tib.solution_value()
-    print(f"#### Reserved Slots: {reserved}, On-Demand TiB: {on_demand}")
-    return reserved, on_demand
+    result = {
+        'status': MPSOLVER_STATUS[status],
+        'reserved_slots': reserved_slots.solution_value(),
+        'on_demand_tib': on_demand_tib.solution_value(),
+        'total_cost': solver.Objective().Value(),
+    }
+    logger.info('Slot optimization result', extra={'data': result})
+    return result
 
 # Example usage
 #query_demand = get_query_demand() #500  # TiB/month
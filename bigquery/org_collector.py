@@ -0,0 +1,264 @@
+# python -m bigquery.org_collector --regions us eu
+# python -m bigquery.org_collector --projects proj-a proj-b --regions us --max-slots 100
+# python -m bigquery.org_collector --organization --regions us eu
+
+import argparse
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from google.api_core import exceptions
+from config import ORGANIZATION_ID, ORG_COLLECTOR_WORKERS, REGIONS
+from gcp_clients import bigquery_client
+from .optimize_bigquery_slots import optimize_slots
+
+logger = logging.getLogger(__name__)
+
+USAGE_COLUMNS = ['project_id', 'region', 'query_tib', 'slot_hours', 'query_jobs', 'failed_jobs', 'error']
+
+# Errors worth retrying; anything else (no access, region not enabled, ...) fails the project at once
+TRANSIENT_ERRORS = (
+    exceptions.TooManyRequests,
+    exceptions.InternalServerError,
+    exceptions.BadGateway,
+    exceptions.ServiceUnavailable,
+    exceptions.GatewayTimeout,
+    exceptions.DeadlineExceeded,
+    ConnectionError,
+)
+
+# Per-project usage, aggregated inside BigQuery so every project returns a single row
+PROJECT_USAGE_SQL = """
+    SELECT
+        SUM(IF(state = 'DONE', total_bytes_processed, 0)) / POWER(1024, 4) AS query_tib,
+        SUM(IF(state = 'DONE', total_slot_ms, 0)) / (1000 * 60 * 60) AS slot_hours,
+        COUNTIF(state = 'DONE') AS query_jobs,
+        COUNTIF(error_result IS NOT NULL) AS failed_jobs
+    FROM
+        `{project_id}`.`region-{region}`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
+    WHERE
+        creation_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days_back} DAY)
+        AND job_type = 'QUERY'
+        AND IFNULL(statement_type, '') != 'SCRIPT'
+    """
+
+# The same figures for every project of the organization in one query per region
+ORGANIZATION_USAGE_SQL = """
+    SELECT
+        project_id,
+        SUM(IF(state = 'DONE', total_bytes_processed, 0)) / POWER(1024, 4) AS query_tib,
+        SUM(IF(state = 'DONE', total_slot_ms, 0)) / (1000 * 60 * 60) AS slot_hours,
+        COUNTIF(state = 'DONE') AS query_jobs,
+        COUNTIF(error_result IS NOT NULL) AS failed_jobs
+    FROM
+        `region-{region}`.INFORMATION_SCHEMA.JOBS_BY_ORGANIZATION
+    WHERE
+        creation_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days_back} DAY)
+        AND job_type = 'QUERY'
+        AND IFNULL(statement_type, '') != 'SCRIPT'
+    GROUP BY project_id
+    """
+
+
+def list_projects(organization_id: str = ORGANIZATION_ID):
+    """
+    List the IDs of the active projects the credentials can see.
+
+    Args:
+        organization_id (str): Limit the search to projects under this organization,
+            including those nested in folders (config.ORGANIZATION_ID /
+            GCP_ORGANIZATION_ID); None lists every visible project.
+
+    Returns:
+        list: Sorted project IDs.
+    """
+    from google.cloud import resourcemanager_v3
+
+    client = resourcemanager_v3.ProjectsClient()
+    if not organization_id:
+        return sorted(project.project_id for project in client.search_projects(query='state:ACTIVE'))
+    # A parent: filter only matches direct children, so walk the folder tree.
+    # list_projects and list_folders skip resources pending deletion.
+    folders = resourcemanager_v3.FoldersClient()
+    project_ids = []
+    parents = [f'organizations/{organization_id}']
+    while parents:
+        parent = parents.pop()
+        project_ids.extend(project.project_id for project in client.list_projects(parent=parent))
+        parents.extend(folder.name for folder in folders.list_folders(parent=parent))
+    return sorted(project_ids)
+
+
+def _with_retry(fetch, max_attempts: int, base_delay_s: float):
+    """
+    Call `fetch()`, retrying transient errors with exponential backoff and full jitter.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fetch()
+        except TRANSIENT_ERRORS:
+            if attempt == max_attempts - 1:
+                raise
+            time.sleep(random.uniform(0, base_delay_s * 2 ** attempt))
+
+
+def _usage_row(project_id, region, row=None, error=None):
+    return {
+        'project_id': project_id,
+        'region': region,
+        'query_tib': float(row.query_tib or 0) if row else 0.0,
+        'slot_hours': float(row.slot_hours or 0) if row else 0.0,
+        'query_jobs': int(row.query_jobs or 0) if row else 0,
+        'failed_jobs': int(row.failed_jobs or 0) if row else 0,
+        'error': error,
+    }
+
+
+def fetch_project_usage(project_id: str, region: str, days_back: int = 30, max_attempts: int = 4,
+                        base_delay_s: float = 1.0):
+    """
+    Query demand and slot usage of one project in one region.
+
+    Failures are returned in the 'error' field instead of raised, so one broken
+    project never takes down a collection run.
+
+    Returns:
+        dict: One usage row, see `USAGE_COLUMNS`.
+    """
+    query = PROJECT_USAGE_SQL.format(project_id=project_id, region=region, days_back=int(days_back))
+    try:
+        rows = _with_retry(lambda: list(bigquery_client(project_id).query(query).result()),
+                           max_attempts, base_delay_s)
+        return _usage_row(project_id, region, rows[0] if rows else None)
+    except Exception as e:
+        return _usage_row(project_id, region, error=f'{type(e).__name__}: {e}')
+
+
+def fetch_organization_usage(region: str, days_back: int = 30, max_attempts: int = 4, base_delay_s: float = 1.0):
+    """
+    Usage of every project of the organization in `region` from JOBS_BY_ORGANIZATION.
+
+    Needs the organization-level `bigquery.jobs.listAll` permission. A failed
+    region yields a single row with no 'project_id' and its 'error' set, instead
+    of raising.
+
+    Returns:
+        list: Usage rows, see `USAGE_COLUMNS`.
+    """
+    query = ORGANIZATION_USAGE_SQL.format(region=region, days_back=int(days_back))
+    try:
+        rows = _with_retry(lambda: list(bigquery_client().query(query).result()), max_attempts, base_delay_s)
+    except Exception as e:
+        return [_usage_row(None, region, error=f'{type(e).__name__}: {e}')]
+    return [_usage_row(row.project_id, region, row) for row in rows]
+
+
+def collect_usage(days_back: int = 30, projects=None, regions=None, organization: bool = False,
+                  max_workers: int = ORG_COLLECTOR_WORKERS, max_attempts: int = 4, base_delay_s: float = 1.0):
+    """
+    Collect query demand and slot usage for many projects and regions into one table.
+
+    With `organization=True` one JOBS_BY_ORGANIZATION query runs per region, and
+    a region that fails gets a single error row.
+    Otherwise every (project, region) pair is queried on a pool of `max_workers`
+    threads, so with enough workers the wall time is close to the slowest project.
+    Each pair retries transient errors on its own, and a pair that still fails
+    gets a row with its 'error' set instead of stopping the run.
+
+    Args:
+        days_back (int): Number of days of job history.
+        projects (list): Project IDs; defaults to `list_projects()`.
+        regions (list): BigQuery regions; defaults to config.REGIONS.
+        organization (bool): Use JOBS_BY_ORGANIZATION instead of per-project queries.
+        max_workers (int): Concurrent per-project queries.
+        max_attempts (int): Attempts per query, including the first.
+        base_delay_s (float): Backoff before the second attempt; doubles each retry.
+
+    Returns:
+        pd.DataFrame: One row per (project, region) with `USAGE_COLUMNS`.
+    """
+    regions = regions or REGIONS
+    if organization:
+        with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+            per_region = pool.map(lambda region: fetch_organization_usage(region, days_back, max_attempts,
+                                                                          base_delay_s), regions)
+            rows = [row for region_rows in per_region for row in region_rows]
+        if projects:
+            wanted = set(projects)
+            rows = [row for row in rows if row['project_id'] in wanted or row['error']]
+    else:
+        projects = projects or list_projects()
+        pairs = [(project_id, region) for project_id in projects for region in regions]
+        with ThreadPoolExecutor(max_workers=max(min(max_workers, len(pairs)), 1)) as pool:
+            rows = list(pool.map(lambda pair: fetch_project_usage(*pair, days_back, max_attempts, base_delay_s),
+                                 pairs))
+    usage = pd.DataFrame(rows, columns=USAGE_COLUMNS)
+    logger.info('Org usage collected', extra={'data': {
+        'pairs': len(usage),
+        'failed': int(usage['error'].notna().sum()),
+        'query_tib': float(usage['query_tib'].sum()),
+        'slot_hours': float(usage['slot_hours'].sum()),
+    }})
+    return usage
+
+
+def optimize_per_project(usage, max_slots: int = 50, **solver_options):
+    """
+    Run `optimize_slots` on each project's demand (summed over its regions).
+
+    Returns:
+        pd.DataFrame: 'project_id', 'query_tib', 'reserved_slots' and 'on_demand_tib'.
+    """
+    demand = usage[usage['error'].isna()].groupby('project_id', as_index=False)['query_tib'].sum()
+    reserved, on_demand = [], []
+    for query_tib in demand['query_tib']:
+        slots, tib = optimize_slots(round(float(query_tib), 2), max_slots, **solver_options)
+        reserved.append(slots)
+        on_demand.append(tib)
+    return demand.assign(reserved_slots=reserved, on_demand_tib=on_demand)
+
+
+def optimize_shared_reservation(usage, max_slots: int = 50, **solver_options):
+    """
+    Run `optimize_slots` once on the combined demand of all projects, as for one
+    reservation shared by the whole organization.
+
+    Returns:
+        dict: 'projects', 'query_tib', 'reserved_slots' and 'on_demand_tib'.
+    """
+    ok = usage[usage['error'].isna()]
+    query_tib = round(float(ok['query_tib'].sum()), 2)
+    reserved, on_demand = optimize_slots(query_tib, max_slots, **solver_options)
+    return {
+        'projects': int(ok['project_id'].nunique()),
+        'query_tib': query_tib,
+        'reserved_slots': reserved,
+        'on_demand_tib': on_demand,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Collect BigQuery demand across projects and regions.')
+    parser.add_argument('--projects', nargs='*', help='Project IDs (default: every visible project)')
+    parser.add_argument('--regions', nargs='*', default=REGIONS)
+    parser.add_argument('--organization', action='store_true', help='Use JOBS_BY_ORGANIZATION')
+    parser.add_argument('--days-back', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=ORG_COLLECTOR_WORKERS)
+    parser.add_argument('--max-slots', type=int, default=50)
+    parser.add_argument('--output', help='Write the usage table to this CSV file')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    usage = collect_usage(args.days_back, args.projects, args.regions, args.organization, args.workers)
+    failed = usage[usage['error'].notna()]
+    print(f'#### Org Usage :: {len(usage)} project/region pairs, {len(failed)} failed, '
+          f'{usage["query_tib"].sum():.2f} TiB, {usage["slot_hours"].sum():.2f} slot-hours, '
+          f'collected in {time.perf_counter() - started:.1f}s')
+    if len(failed):
+        print(failed[['project_id', 'region', 'error']].to_string(index=False))
+    print(optimize_per_project(usage, args.max_slots).to_string(index=False))
+    print('------------------------------------------------------------- ')
+    print('#### Shared Reservation :: ', optimize_shared_reservation(usage, args.max_slots))
+    if args.output:
+        usage.to_csv(args.output, index=False)
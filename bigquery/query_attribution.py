@@ -0,0 +1,256 @@
+import hashlib
+import heapq
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from config import PROJECT_ID, REGION
+from gcp_clients import bigquery_client
+from .bigquery_cost_calculator import FLAT_RATE_SLOT_HOURLY_COST, ON_DEMAND_COST_PER_TB_BY_REGION
+from .data_cache import cached
+
+logger = logging.getLogger(__name__)
+
+# Comments | backticked identifiers | string literals | numeric literals, scanned
+# left to right so '--' inside a string is not taken for a comment. Comments are
+# dropped, identifiers kept and literals replaced by '?'.
+SQL_TOKEN_PATTERN = re.compile(
+    r"(--[^\n]*|#[^\n]*|/\*.*?\*/)"
+    r"|(`[^`]*`)"
+    r"|('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")"
+    r"|(\b\d+(?:\.\d+)?(?:e[+-]?\d+)?\b)",
+    re.I | re.S,
+)
+# IN (?, ?, ?) -> IN (?) so lists of different lengths share a fingerprint
+SQL_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# Whitespace around operators and punctuation, so a = ? and a=? share a fingerprint
+SQL_OPERATOR_SPACE_PATTERN = re.compile(r"\s*([=<>!,()+\-*/])\s*")
+
+
+def _replace_token(match):
+    if match.group(1):
+        return ' '
+    return match.group(2) or '?'
+
+
+def normalize_sql(sql: str):
+    """
+    Reduce a SQL statement to its shape: comments removed, string and numeric
+    literals replaced by '?', IN lists collapsed, whitespace around operators and
+    punctuation removed, remaining whitespace and case folded.
+
+    Args:
+        sql (str): SQL text as it appears in INFORMATION_SCHEMA.JOBS.query.
+
+    Returns:
+        str: The normalized statement.
+    """
+    sql = SQL_TOKEN_PATTERN.sub(_replace_token, sql)
+    sql = SQL_IN_LIST_PATTERN.sub('(?)', sql)
+    sql = SQL_OPERATOR_SPACE_PATTERN.sub(r'\1', sql)
+    return ' '.join(sql.split()).lower()
+
+
+def fingerprint_sql(sql: str):
+    """
+    Short stable id of a statement's normalized shape (see `normalize_sql`).
+    """
+    return hashlib.sha1(normalize_sql(sql or '').encode('utf-8')).hexdigest()[:16]
+
+
+class QueryAttribution:
+    """
+    Streaming per-fingerprint and per-user aggregation of job rows.
+
+    Rows are folded into hash tables as they arrive, so job history is read in a
+    single pass without being held in memory. With `max_fingerprints` set, the
+    fingerprint table becomes a weighted space-saving sketch: it never holds more
+    than that many entries, and when a new fingerprint arrives the entry with the
+    fewest bytes is evicted and its bytes are carried over to the newcomer. Bytes
+    (and the cost derived from them) are then upper bounds, off by at most
+    'error_bytes', and every fingerprint that scanned more than total/max_fingerprints
+    bytes is guaranteed to be kept. Per-user totals are always exact.
+
+    Example:
+        attribution = QueryAttribution()
+        attribution.update(query_job.result())
+        attribution.top_queries(10)
+    """
+    # Per-fingerprint entry: [executions, bytes, slot_ms, error_bytes, sample query]
+    def __init__(self, region: str = REGION, max_fingerprints: int = None):
+        self.on_demand_cost_per_tb = ON_DEMAND_COST_PER_TB_BY_REGION.get(region.lower(), 6.25)
+        self.max_fingerprints = max_fingerprints
+        self.fingerprints = {}
+        self.users = {}
+        self.total_jobs = 0
+        self.total_bytes = 0
+        self.total_slot_ms = 0
+        # (bytes, fingerprint) min-heap used to find the sketch entry to evict
+        self._heap = []
+
+    def add(self, query, user_email, total_bytes_processed, total_slot_ms):
+        total_bytes_processed = total_bytes_processed or 0
+        total_slot_ms = total_slot_ms or 0
+        self.total_jobs += 1
+        self.total_bytes += total_bytes_processed
+        self.total_slot_ms += total_slot_ms
+
+        user = self.users.get(user_email)
+        if user is None:
+            user = self.users[user_email] = [0, 0, 0]
+        user[0] += 1
+        user[1] += total_bytes_processed
+        user[2] += total_slot_ms
+
+        fingerprint = fingerprint_sql(query)
+        entry = self.fingerprints.get(fingerprint)
+        if entry is None:
+            error = 0
+            if self.max_fingerprints and len(self.fingerprints) >= self.max_fingerprints:
+                error = self._evict()
+            entry = self.fingerprints[fingerprint] = [0, error, 0, error, query]
+            if self.max_fingerprints:
+                heapq.heappush(self._heap, (error, fingerprint))
+        entry[0] += 1
+        entry[1] += total_bytes_processed
+        entry[2] += total_slot_ms
+
+    def _evict(self):
+        # Each kept fingerprint has one heap entry whose bytes may be stale (too low);
+        # refresh stale entries until the smallest one is current, then evict it
+        while True:
+            bytes_seen, fingerprint = heapq.heappop(self._heap)
+            entry = self.fingerprints[fingerprint]
+            if entry[1] == bytes_seen:
+                del self.fingerprints[fingerprint]
+                return bytes_seen
+            heapq.heappush(self._heap, (entry[1], fingerprint))
+
+    def update(self, rows):
+        """
+        Fold rows with `query`, `user_email`, `total_bytes_processed` and `total_slot_ms`.
+        """
+        for row in rows:
+            self.add(row.query, row.user_email, row.total_bytes_processed, row.total_slot_ms)
+        return self
+
+    def _cost(self, total_bytes):
+        return total_bytes / 1024 ** 4 * self.on_demand_cost_per_tb
+
+    def top_queries(self, n: int = 10):
+        """
+        The `n` fingerprints with the highest on-demand cost.
+
+        'projected_savings' is what the shape would cost less if only its first
+        execution were billed and the repeats were served from reused results
+        (cached or materialized): cost * (1 - 1/executions). With a sketch, it is
+        computed from the guaranteed bytes (bytes - error_bytes), which belong to
+        exactly the counted executions, so it is a lower bound rather than inflated
+        by bytes inherited from evicted fingerprints.
+
+        Returns:
+            list: Dicts with 'fingerprint', 'sample_query', 'executions', 'tib_processed',
+            'slot_hours', 'cost', 'flat_rate_cost', 'projected_savings' and 'error_bytes'.
+        """
+        top = heapq.nlargest(n, self.fingerprints.items(), key=lambda item: item[1][1])
+        results = []
+        for fingerprint, (executions, total_bytes, slot_ms, error_bytes, sample_query) in top:
+            cost = self._cost(total_bytes)
+            guaranteed_cost = self._cost(total_bytes - error_bytes)
+            results.append({
+                'fingerprint': fingerprint,
+                'sample_query': sample_query,
+                'executions': executions,
+                'tib_processed': round(total_bytes / 1024 ** 4, 4),
+                'slot_hours': round(slot_ms / (1000 * 60 * 60), 2),
+                'cost': round(cost, 2),
+                'flat_rate_cost': round(slot_ms / (1000 * 60 * 60) * FLAT_RATE_SLOT_HOURLY_COST, 2),
+                'projected_savings': round(guaranteed_cost * (1 - 1 / executions), 2),
+                'error_bytes': error_bytes,
+            })
+        return results
+
+    def top_users(self, n: int = 10):
+        """
+        The `n` users with the highest on-demand cost.
+
+        Returns:
+            list: Dicts with 'user_email', 'jobs', 'tib_processed', 'slot_hours' and 'cost'.
+        """
+        top = heapq.nlargest(n, self.users.items(), key=lambda item: item[1][1])
+        return [
+            {
+                'user_email': user_email,
+                'jobs': jobs,
+                'tib_processed': round(total_bytes / 1024 ** 4, 4),
+                'slot_hours': round(slot_ms / (1000 * 60 * 60), 2),
+                'cost': round(self._cost(total_bytes), 2),
+            }
+            for user_email, (jobs, total_bytes, slot_ms) in top
+        ]
+
+    def summary(self, n: int = 10):
+        return {
+            'total_jobs': self.total_jobs,
+            'distinct_fingerprints': len(self.fingerprints),
+            'total_cost': round(self._cost(self.total_bytes), 2),
+            'total_slot_hours': round(self.total_slot_ms / (1000 * 60 * 60), 2),
+            'top_queries': self.top_queries(n),
+            'top_users': self.top_users(n),
+        }
+
+
+@cached()
+def get_query_attribution(days_back: int = 30, top_n: int = 10, max_fingerprints: int = None):
+    """
+    Attributes BigQuery on-demand cost over the last `days_back` days to recurring
+    query shapes and to users, by querying INFORMATION_SCHEMA.JOBS_BY_PROJECT.
+
+    Script parent jobs are excluded because their child statements are billed
+    (and listed) on their own.
+
+    Args:
+        days_back (int): The number of days back from now to analyze.
+        top_n (int): Number of query fingerprints and users to return.
+        max_fingerprints (int): Bound the fingerprint table with a space-saving
+            sketch of this size (see `QueryAttribution`); None keeps it exact.
+
+    Returns:
+        dict: 'total_jobs', 'distinct_fingerprints', 'total_cost', 'total_slot_hours',
+        'top_queries' and 'top_users', or an empty dictionary on error.
+    """
+    # UTC: TIMESTAMP() reads a string without an offset as UTC
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=days_back)
+
+    query = f"""
+    SELECT
+        query,
+        user_email,
+        total_bytes_processed,
+        total_slot_ms
+    FROM
+        `{PROJECT_ID}`.`region-{REGION}`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
+    WHERE
+        creation_time BETWEEN TIMESTAMP('{start_time.isoformat()}')
+        AND TIMESTAMP('{end_time.isoformat()}')
+        AND state = 'DONE'
+        AND job_type = 'QUERY'
+        AND IFNULL(statement_type, '') != 'SCRIPT'
+    """
+
+    try:
+        query_job = bigquery_client(PROJECT_ID).query(query)
+        attribution = QueryAttribution(REGION, max_fingerprints).update(query_job.result())
+        results = attribution.summary(top_n)
+        logger.info('Query attribution', extra={'data': {
+            'total_jobs': results['total_jobs'],
+            'distinct_fingerprints': results['distinct_fingerprints'],
+            'total_cost': results['total_cost'],
+            'top_queries': [{k: row[k] for k in ('fingerprint', 'executions', 'cost', 'projected_savings')}
+                            for row in results['top_queries']],
+        }})
+        return results
+
+    except Exception:
+        logger.exception('Query attribution failed')
+        return {}
@@ -0,0 +1,287 @@
+# python -m bigquery.slot_simulator --days-back 30 --baselines 0 50 100 200 --autoscale 0 100
+# python -m bigquery.slot_simulator --synthetic 1000000 --baselines 100 200 400 --autoscale 0 200
+
+import argparse
+import heapq
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from config import PROJECT_ID, REGION
+from gcp_clients import bigquery_client
+from .bigquery_cost_calculator import AUTOSCALE_SLOT_HOURLY_COST, FLAT_RATE_SLOT_HOURLY_COST
+from .data_cache import cached
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+
+def jobs_from_rows(rows):
+    """
+    Turn per-job rows into the arrays `simulate_reservation` replays.
+
+    Args:
+        rows (Iterable): Rows with `creation_time` (datetime), `total_slot_ms` and
+            `max_parallelism` (peak slots the job used) attributes.
+
+    Returns:
+        dict: 'arrival_s' (seconds since the first job), 'slot_ms' and
+        'max_parallelism' as NumPy arrays.
+    """
+    arrival, slot_ms, parallelism = [], [], []
+    for row in rows:
+        arrival.append(row.creation_time.timestamp())
+        slot_ms.append(row.total_slot_ms or 0)
+        parallelism.append(row.max_parallelism or 1)
+    arrival = np.asarray(arrival, dtype=float)
+    return {
+        'arrival_s': arrival - arrival.min() if len(arrival) else arrival,
+        'slot_ms': np.asarray(slot_ms, dtype=float),
+        'max_parallelism': np.maximum(np.asarray(parallelism, dtype=float).round(), 1),
+    }
+
+
+@cached()
+def get_job_history(days_back: int = 30):
+    """
+    Fetches query jobs of the last `days_back` days with their slot usage and peak
+    parallelism from INFORMATION_SCHEMA.JOBS_TIMELINE_BY_PROJECT.
+
+    Peak parallelism is the largest number of slots a job held in any one second.
+    Script parent jobs are excluded because their child statements report the
+    same slot time on their own.
+
+    Returns:
+        dict: Job arrays, see `jobs_from_rows`.
+    """
+    # UTC: TIMESTAMP() reads a string without an offset as UTC
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=days_back)
+
+    query = f"""
+    SELECT
+        job_id,
+        MIN(job_creation_time) AS creation_time,
+        SUM(period_slot_ms) AS total_slot_ms,
+        CEIL(MAX(period_slot_ms) / 1000) AS max_parallelism
+    FROM
+        `{PROJECT_ID}`.`region-{REGION}`.INFORMATION_SCHEMA.JOBS_TIMELINE_BY_PROJECT
+    WHERE
+        job_creation_time BETWEEN TIMESTAMP('{start_time.isoformat()}')
+        AND TIMESTAMP('{end_time.isoformat()}')
+        AND job_type = 'QUERY'
+        AND IFNULL(statement_type, '') != 'SCRIPT'
+    GROUP BY job_id
+    """
+    jobs = jobs_from_rows(bigquery_client(PROJECT_ID).query(query).result())
+    logger.info('Job history loaded', extra={'data': {'jobs': len(jobs['arrival_s']), 'days_back': days_back}})
+    return jobs
+
+
+def simulate_reservation(arrival_s, slot_ms, max_parallelism, baseline_slots: int, autoscale_max_slots: int = 0,
+                         idle_slots: int = 0, autoscale_increment: int = 50, min_grant: int = 1):
+    """
+    Replay jobs against a reservation with a discrete-event simulation.
+
+    Each job asks for up to `max_parallelism` slots when it starts and keeps the
+    slots it was granted until its `slot_ms` of work is done, so a job started
+    during contention runs slower. When fewer than `min_grant` slots are free, jobs
+    wait in FIFO order. Slots are taken from the baseline first, then from the idle
+    slots shared by other reservations, then from autoscaling. The autoscaler grows
+    in `autoscale_increment` steps up to `autoscale_max_slots` as soon as a job
+    needs more slots and shrinks when they are released. Its one-minute minimum
+    billing window is not modelled.
+
+    Events are job arrivals (read in order from the sorted arrays) and completions
+    (a heap of finish times). Per-job state lives in NumPy arrays, so a month of a
+    million jobs replays in seconds.
+
+    Args:
+        arrival_s (np.ndarray): Job arrival times in seconds.
+        slot_ms (np.ndarray): Slot-milliseconds of work per job.
+        max_parallelism (np.ndarray): Peak slots each job can use.
+        baseline_slots (int): Always-on slots of the reservation.
+        autoscale_max_slots (int): Extra slots the autoscaler may add.
+        idle_slots (int): Idle slots borrowed from other reservations (not billed).
+        autoscale_increment (int): Autoscaling step in slots.
+        min_grant (int): Fewest slots a job starts with.
+
+    Returns:
+        dict: 'jobs', 'period_hours', queue delay percentiles ('queue_delay_s'),
+        slowdown percentiles ('slowdown', elapsed time over the time the job takes
+        with all its slots), 'avg_slots_in_use', 'slot_utilization',
+        'autoscale_slot_hours', 'baseline_cost', 'autoscale_cost' and 'total_cost'.
+
+    Raises:
+        ValueError: If the reservation has no slots at all.
+    """
+    fixed = baseline_slots + idle_slots
+    if fixed + autoscale_max_slots <= 0:
+        raise ValueError('The reservation has no slots; use on-demand pricing instead')
+
+    order = np.argsort(arrival_s, kind='stable')
+    arrivals = np.asarray(arrival_s, dtype=float)[order]
+    work_s = (np.asarray(slot_ms, dtype=float)[order] / 1000)
+    caps = np.clip(np.asarray(max_parallelism, dtype=float)[order], 1, fixed + autoscale_max_slots).astype(int)
+    n = len(arrivals)
+
+    # Plain lists are much faster than NumPy scalars inside the event loop
+    arrival_list, work_list, cap_list = arrivals.tolist(), work_s.tolist(), caps.tolist()
+    start_list, finish_list, grant_list = [0.0] * n, [0.0] * n, [0] * n
+
+    running = []      # heap of (finish time, job)
+    waiting = deque()
+    in_use = autoscale = 0
+    used_slot_s = autoscale_slot_s = 0.0
+    now = arrival_list[0] if n else 0.0
+
+    def try_start(job, t):
+        nonlocal in_use, autoscale
+        cap = cap_list[job]
+        free = fixed + autoscale - in_use
+        if free < cap and autoscale < autoscale_max_slots:
+            steps = math.ceil((cap - free) / autoscale_increment)
+            autoscale = min(autoscale_max_slots, autoscale + steps * autoscale_increment)
+            free = fixed + autoscale - in_use
+        granted = min(cap, free)
+        if granted < min(min_grant, cap):
+            return False
+        in_use += granted
+        start_list[job] = t
+        grant_list[job] = granted
+        end = t + work_list[job] / granted
+        finish_list[job] = end
+        heapq.heappush(running, (end, job))
+        return True
+
+    next_arrival = 0
+    while next_arrival < n or running:
+        if running and (next_arrival >= n or running[0][0] <= arrival_list[next_arrival]):
+            t, job = heapq.heappop(running)
+            used_slot_s += in_use * (t - now)
+            autoscale_slot_s += autoscale * (t - now)
+            now = t
+            in_use -= grant_list[job]
+            while waiting and try_start(waiting[0], t):
+                waiting.popleft()
+            needed = max(in_use - fixed, 0)
+            autoscale = min(autoscale, math.ceil(needed / autoscale_increment) * autoscale_increment)
+        else:
+            t = arrival_list[next_arrival]
+            used_slot_s += in_use * (t - now)
+            autoscale_slot_s += autoscale * (t - now)
+            now = t
+            if waiting or not try_start(next_arrival, t):
+                waiting.append(next_arrival)
+            next_arrival += 1
+
+    start, finish = np.asarray(start_list), np.asarray(finish_list)
+    period_s = max(now - (arrivals[0] if n else 0.0), 1.0)
+    queue_delay = start - arrivals
+    ideal = work_s / caps
+    has_work = ideal > 0
+    slowdown = (finish[has_work] - arrivals[has_work]) / ideal[has_work]
+    available_slot_s = fixed * period_s + autoscale_slot_s
+    baseline_cost = baseline_slots * period_s / 3600 * FLAT_RATE_SLOT_HOURLY_COST
+    autoscale_cost = autoscale_slot_s / 3600 * AUTOSCALE_SLOT_HOURLY_COST
+
+    def percentiles(values):
+        if not len(values):
+            return dict({f'p{p}': 0.0 for p in PERCENTILES}, max=0.0)
+        points = np.percentile(values, PERCENTILES)
+        return dict({f'p{p}': round(float(v), 3) for p, v in zip(PERCENTILES, points)},
+                    max=round(float(values.max()), 3))
+
+    return {
+        'baseline_slots': baseline_slots,
+        'autoscale_max_slots': autoscale_max_slots,
+        'idle_slots': idle_slots,
+        'jobs': n,
+        'period_hours': round(period_s / 3600, 2),
+        'queue_delay_s': percentiles(queue_delay),
+        'slowdown': percentiles(slowdown),
+        'avg_slots_in_use': round(used_slot_s / period_s, 2),
+        'slot_utilization': round(used_slot_s / available_slot_s, 4) if available_slot_s else 0.0,
+        'autoscale_slot_hours': round(autoscale_slot_s / 3600, 2),
+        'baseline_cost': round(baseline_cost, 2),
+        'autoscale_cost': round(autoscale_cost, 2),
+        'total_cost': round(baseline_cost + autoscale_cost, 2),
+    }
+
+
+def sweep_reservations(jobs, baselines, autoscale_maxes=(0,), idle_slots: int = 0, autoscale_increment: int = 50):
+    """
+    Simulate every (baseline, autoscale max) pair on the same jobs.
+
+    Args:
+        jobs (dict): Job arrays, see `jobs_from_rows`.
+        baselines (list): Baseline slot counts to try.
+        autoscale_maxes (list): Autoscale maxima to try.
+
+    Returns:
+        list: `simulate_reservation` results; pairs without any slots are skipped.
+    """
+    results = []
+    for baseline in baselines:
+        for autoscale_max in autoscale_maxes:
+            if baseline + idle_slots + autoscale_max <= 0:
+                continue
+            results.append(simulate_reservation(jobs['arrival_s'], jobs['slot_ms'], jobs['max_parallelism'],
+                                                baseline, autoscale_max, idle_slots, autoscale_increment))
+    return results
+
+
+def cost_latency_frontier(results, percentile: str = 'p99'):
+    """
+    Keep the reservations no other reservation beats on both cost and queue delay.
+
+    Returns:
+        list: Pareto-optimal results, cheapest first.
+    """
+    frontier = []
+    best_delay = math.inf
+    for result in sorted(results, key=lambda r: (r['total_cost'], r['queue_delay_s'][percentile])):
+        delay = result['queue_delay_s'][percentile]
+        if delay < best_delay:
+            frontier.append(result)
+            best_delay = delay
+    return frontier
+
+
+def print_sweep(results, percentile: str = 'p99'):
+    frontier = {id(r) for r in cost_latency_frontier(results, percentile)}
+    print(f"{'baseline':>8} {'autoscale':>9} {'cost ($)':>10} {'util':>6} "
+          f"{'delay p50':>10} {'delay ' + percentile:>10} {'slowdown ' + percentile:>12}")
+    for r in results:
+        print(f"{r['baseline_slots']:>8} {r['autoscale_max_slots']:>9} {r['total_cost']:>10.2f} "
+              f"{r['slot_utilization']:>6.2f} {r['queue_delay_s']['p50']:>10.2f} "
+              f"{r['queue_delay_s'][percentile]:>10.2f} {r['slowdown'][percentile]:>12.2f}"
+              f"{'  *' if id(r) in frontier else ''}")
+    print('------------------------------------------------------------- ')
+    print('#### * = on the cost/latency frontier')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay job history against candidate slot reservations.')
+    parser.add_argument('--days-back', type=int, default=30)
+    parser.add_argument('--synthetic', type=float, help='Simulate this many generated jobs instead of job history')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baselines', nargs='*', type=int, default=[0, 50, 100, 200, 400])
+    parser.add_argument('--autoscale', nargs='*', type=int, default=[0, 100])
+    parser.add_argument('--idle-slots', type=int, default=0, help='Idle slots shared by other reservations')
+    parser.add_argument('--increment', type=int, default=50, help='Autoscaling step in slots')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from benchmarks.generators import job_arrays
+        jobs = job_arrays(seed=args.seed, n=int(args.synthetic), days=args.days_back)
+    else:
+        jobs = get_job_history(args.days_back)
+    started = time.perf_counter()
+    results = sweep_reservations(jobs, args.baselines, args.autoscale, args.idle_slots, args.increment)
+    print_sweep(results)
+    print(f'#### Simulated {len(results)} reservations of {len(jobs["arrival_s"])} jobs in '
+          f'{time.perf_counter() - started:.1f}s')
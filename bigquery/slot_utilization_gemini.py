@@ -1,25 +1,69 @@
-from google.cloud import bigquery
+import logging
 from datetime import datetime, timedelta
-from google.oauth2 import service_account
-from config import SERVICE_ACCOUNT_KEY, PROJECT_ID
-import json
+from config import PROJECT_ID, REGION
+from gcp_clients import bigquery_client
+from .data_cache import cached
 
-def get_bigquery_slot_utilization_for_project(days_back: int = 30):
+logger = logging.getLogger(__name__)
+
+def aggregate_slot_usage(rows):
+    """
+    Aggregate INFORMATION_SCHEMA.JOBS rows into slot usage counters in a single pass.
+
+    Args:
+        rows (Iterable): Rows with `state`, `job_type` and `total_slot_ms` attributes.
+
+    Returns:
+        dict: 'total_slot_ms' of successful query jobs, 'successful_query_jobs',
+        'failed_jobs' and 'total_jobs'.
+    """
+    total_slot_ms_sum = 0
+    successful_jobs_count = 0
+    failed_jobs_count = 0
+    total_jobs_count = 0
+
+    for row in rows:
+        total_jobs_count += 1
+        if row.state == 'DONE' and row.job_type == 'QUERY':
+            ms = 0
+            if row.total_slot_ms is not None:
+                ms = row.total_slot_ms
+            total_slot_ms_sum += ms
+            successful_jobs_count += 1
+        elif row.state == 'DONE' and row.job_type != 'QUERY':
+            # Consider other job types if relevant for your "utilization" definition
+            pass
+        elif row.state == 'DONE' and row.total_slot_ms is None:
+            # Some jobs might not consume slots (e.g., DDL, metadata queries)
+            pass
+        elif row.state == 'FAILED':
+            failed_jobs_count += 1
+
+    return {
+        'total_slot_ms': total_slot_ms_sum,
+        'successful_query_jobs': successful_jobs_count,
+        'failed_jobs': failed_jobs_count,
+        'total_jobs': total_jobs_count,
+    }
+
+@cached()
+def get_bigquery_slot_utilization_for_project(days_back: int = 30, project_id: str = PROJECT_ID,
+                                              region: str = REGION):
     """
     Retrieves and aggregates BigQuery slot utilization data for a given project
     by querying INFORMATION_SCHEMA.JOBS_BY_PROJECT.
 
     Args:
         days_back (int): The number of days back from now to retrieve job data.
+        project_id (str): The ID of the Google Cloud project to analyze.
+        region (str): The BigQuery region of the project's jobs, e.g. 'us'.
 
     Returns:
         dict: A dictionary containing aggregated slot usage data (e.g., total_slot_ms,
               total_jobs) or an empty dictionary if no data is found.
     """
 
-    # Create credentials object
-    credentials = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_KEY)
-    client = bigquery.Client(credentials=credentials, project=PROJECT_ID)
+    client = bigquery_client(project_id)
 
     # Define the time range for the query
     end_time = datetime.now()
@@ -32,7 +76,7 @@ def get_bigquery_slot_utilization_for_project(days_back: int = 30):
         job_type,
         state
     FROM
-        `{PROJECT_ID}`.`region-us`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
+        `{project_id}`.`region-{region}`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
     WHERE
         creation_time BETWEEN TIMESTAMP('{start_time.isoformat()}')
         AND TIMESTAMP('{end_time.isoformat()}')
@@ -43,29 +87,9 @@ def get_bigquery_slot_utilization_for_project(days_back: int = 30):
 
     try:
         query_job = client.query(query)
-        rows = list(query_job.result())  # Waits for the query to complete
-
-        total_slot_ms_sum = 0
-        successful_jobs_count = 0
-        failed_jobs_count = 0
-        total_jobs_count = 0
-
-        for row in rows:
-            total_jobs_count += 1
-            if row.state == 'DONE' and row.job_type == 'QUERY':
-                ms = 0
-                if row.total_slot_ms is not None:
-                    ms = row.total_slot_ms 
-                total_slot_ms_sum += ms
-                successful_jobs_count += 1
-            elif row.state == 'DONE' and row.job_type != 'QUERY':
-                # Consider other job types if relevant for your "utilization" definition
-                pass
-            elif row.state == 'DONE' and row.total_slot_ms is None:
-                # Some jobs might not consume slots (e.g., DDL, metadata queries)
-                pass
-            elif row.state == 'FAILED':
-                failed_jobs_count += 1
+        # Waits for the query to complete; rows are aggregated as the pages stream in
+        usage = aggregate_slot_usage(query_job.result())
+        total_slot_ms_sum = usage['total_slot_ms']
 
         # Calculate total duration in milliseconds for the period
         # period_ms = (end_time - start_time).total_seconds() * 1000
@@ -77,24 +101,23 @@ def get_bigquery_slot_utilization_for_project(days_back: int = 30):
 
 
         results = {
-            "project_id": PROJECT_ID,
+            "project_id": project_id,
             #"start_time": start_time.isoformat(),
             #"end_time": end_time.isoformat(),
-            #"total_queried_jobs": total_jobs_count,
-            #"successful_query_jobs": successful_jobs_count,
-            #"failed_jobs": failed_jobs_count,
+            #"total_queried_jobs": usage['total_jobs'],
+            #"successful_query_jobs": usage['successful_query_jobs'],
+            #"failed_jobs": usage['failed_jobs'],
             #"total_slot_ms_consumed": total_slot_ms_sum,
             #"analysis_period_ms": period_ms,
             "total_slot_hours_consumed":  round(float(total_slot_ms_sum / (1000 * 60 * 60)), 2)
             # Add more calculations as needed, e.g., average slots used
             # average_slots_per_second = total_slot_ms_sum / period_ms if period_ms > 0 else 0
         }
-        print('#### Slot Utilization Result :: ', json.dumps(results, indent=4))
-        print('------------------------------------------------------------- ')
+        logger.info('Slot utilization result', extra={'data': results})
         return results
 
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    except Exception:
+        logger.exception('Slot utilization query failed', extra={'data': {'project_id': project_id}})
         return {}
 
 """
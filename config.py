@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Get the project root directory (where config.py is located)
@@ -7,3 +8,33 @@ SERVICE_ACCOUNT_KEY = PROJECT_ROOT / "abc.json"
 #print('SERVICE_ACCOUNT_KEY ===>> ', SERVICE_ACCOUNT_KEY)
 PROJECT_ID = 'cost-optimization-467817'
 REGION = 'us'
+# Regions and organization the org-wide collector (bigquery/org_collector.py) scans
+REGIONS = ['us']
+ORGANIZATION_ID = os.getenv('GCP_ORGANIZATION_ID')
+# Concurrent per-project queries of the org-wide collector
+ORG_COLLECTOR_WORKERS = 32
+# How long (seconds) the agent tools reuse a fetched BigQuery data snapshot
+DATA_CACHE_TTL_SECONDS = 15 * 60
+# Worker processes the optimization service keeps warm for OR-Tools solves
+SERVICE_SOLVER_WORKERS = 4
+# Local JSON-lines file the solver spans and metrics are exported to (one per process, see solver_telemetry.py)
+TELEMETRY_FILE = PROJECT_ROOT / "solver_telemetry.jsonl"
+# GCP client mode: 'live' talks to GCP, 'record' also saves every response to
+# REPLAY_DIR, 'replay' serves the saved responses offline (see gcp_clients.py)
+GCP_CLIENT_MODE = os.getenv('GCP_CLIENT_MODE', 'live')
+REPLAY_DIR = Path(os.getenv('GCP_REPLAY_DIR', PROJECT_ROOT / "replay_data"))
+# Replay page size and injected latency per page/download, in milliseconds
+REPLAY_PAGE_SIZE = int(os.getenv('GCP_REPLAY_PAGE_SIZE', 1000))
+REPLAY_LATENCY_MS = float(os.getenv('GCP_REPLAY_LATENCY_MS', 0))
+# Structured logging (structured_logging.py): JSON-lines file (one per process,
+# <stem>.<pid>.jsonl), optional Cloud Logging export and per-logger levels ('' is the root logger)
+LOG_FILE = PROJECT_ROOT / "cost_optimizer.log.jsonl"
+LOG_TO_CLOUD = os.getenv('LOG_TO_CLOUD', '') == '1'
+LOG_LEVELS = {
+    '': 'WARNING',
+    'agent': 'INFO',
+    'bigquery': 'INFO',
+    'optimize_gcs_storage': 'INFO',
+    'schedule_queries': 'INFO',
+    'vm_cost_optimization': 'INFO',
+}
@@ -1,12 +1,25 @@
-from google.cloud import storage
+from gcp_clients import storage_client
 
 def get_gcs_data_points(bucket_name):
-    client = storage.Client()
+    client = storage_client()
     bucket = client.bucket(bucket_name)
 
-    data_points = []
     blobs = bucket.list_blobs()
 
+    return to_data_points(blobs)
+
+def to_data_points(blobs):
+    """
+    Convert a blob listing into the data points used by the storage optimizer.
+
+    Args:
+        blobs (Iterable): Blobs with `name` and `size` (bytes) attributes.
+
+    Returns:
+        list: Dicts with 'name', 'size_gb' and 'access_frequency'.
+    """
+    data_points = []
+
     for blob in blobs:
         # blob.size is the size in bytes
         size_gb = blob.size / (1024**3) if blob.size else 0
@@ -26,8 +39,10 @@ def get_gcs_data_points(bucket_name):
     return data_points
 
 # Example usage:
-bucket_name = "your-bucket-name"
-datasets_info = get_gcs_data_points(bucket_name)
+if __name__ == "__main__":
+    bucket_name = "your-bucket-name"
+    datasets_info = get_gcs_data_points(bucket_name)
+
+    for dataset in datasets_info:
+        print(f"Object: {dataset['name']}, Size (GB): {dataset['size_gb']}, Access Frequency: {dataset['access_frequency']}")
 
-for dataset in datasets_info:
-    print(f"Object: {dataset['name']}, Size (GB): {dataset['size_gb']}, Access Frequency: {dataset['access_frequency']}")
@@ -0,0 +1,235 @@
+# python -m demand_forecast --synthetic 10000
+# python -m demand_forecast --days-back 28
+
+import argparse
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from statistics import NormalDist
+import numpy as np
+from config import PROJECT_ID, REGION
+from gcp_clients import bigquery_client
+from bigquery.data_cache import cached
+
+HOURS_PER_WEEK = 24 * 7
+HOURS_PER_MONTH = 24 * 30
+
+
+def forecast(history, horizon: int, season_length: int = HOURS_PER_WEEK, interval: float = 0.9,
+             start_phase: int = 0, iterations: int = 2):
+    """
+    Forecast many series at once with a linear trend plus a seasonal profile.
+
+    Every row of `history` is one series (a project, bucket or instance group).
+    The model is y[t] = level + slope * t + profile[t % season_length] + noise. For
+    hourly data the default 168-bucket profile is the day-of-week x hour-of-day
+    shape; use season_length=7 for daily data. Trend and profile are fitted by
+    alternating least squares (`iterations` rounds) over the whole matrix, so
+    thousands of series cost a few array operations, not a Python loop.
+
+    Prediction intervals assume independent normal residuals and include the
+    uncertainty of the fitted trend. The profile is treated as known.
+
+    Args:
+        history (np.ndarray): Shape (series, periods), oldest period first.
+        horizon (int): Periods to forecast.
+        season_length (int): Periods per seasonal cycle.
+        interval (float): Coverage of the prediction intervals, e.g. 0.9.
+        start_phase (int): Position of history[:, 0] in the seasonal cycle, e.g. the
+            hour of the week (Monday 00:00 = 0) for hourly data.
+        iterations (int): Trend/profile fitting rounds.
+
+    Returns:
+        dict: 'point', 'lower' and 'upper' per period (series, horizon); 'total',
+        'total_lower' and 'total_upper' over the horizon (series,); 'slope' per
+        period and residual 'sigma' (series,). Forecasts are clipped at zero.
+    """
+    y = np.atleast_2d(np.asarray(history, dtype=float))
+    num_series, periods = y.shape
+    t = np.arange(periods, dtype=float)
+    t_mean = t.mean()
+    t_centered = t - t_mean
+    sxx = max(float((t_centered ** 2).sum()), 1e-12)
+
+    phase = (start_phase + np.arange(periods)) % season_length
+    # (periods, season_length) indicator: residuals @ buckets / counts = mean per bucket
+    buckets = np.zeros((periods, season_length))
+    buckets[np.arange(periods), phase] = 1.0
+    counts = np.maximum(buckets.sum(axis=0), 1.0)
+
+    profile = np.zeros((num_series, season_length))
+    for _ in range(iterations):
+        deseasonalized = y - profile[:, phase]
+        slope = deseasonalized @ t_centered / sxx
+        level = deseasonalized.mean(axis=1) - slope * t_mean
+        detrended = y - level[:, None] - slope[:, None] * t
+        profile = detrended @ buckets / counts
+        profile -= profile[:, np.unique(phase)].mean(axis=1, keepdims=True)
+
+    fitted = level[:, None] + slope[:, None] * t + profile[:, phase]
+    dof = max(periods - 2 - min(season_length, periods), 1)
+    sigma = np.sqrt(((y - fitted) ** 2).sum(axis=1) / dof)
+
+    future_t = periods + np.arange(horizon, dtype=float)
+    future_phase = (start_phase + periods + np.arange(horizon)) % season_length
+    point = level[:, None] + slope[:, None] * future_t + profile[:, future_phase]
+
+    z = NormalDist().inv_cdf(0.5 + interval / 2)
+    spread = z * sigma[:, None] * np.sqrt(1 + 1 / periods + (future_t - t_mean) ** 2 / sxx)
+    # Sum over the horizon: the noise adds up independently, the trend error does not
+    total_spread = z * sigma * math.sqrt(horizon + horizon ** 2 / periods
+                                         + (future_t - t_mean).sum() ** 2 / sxx)
+    total = point.sum(axis=1)
+    return {
+        'point': np.maximum(point, 0),
+        'lower': np.maximum(point - spread, 0),
+        'upper': np.maximum(point + spread, 0),
+        'total': np.maximum(total, 0),
+        'total_lower': np.maximum(total - total_spread, 0),
+        'total_upper': np.maximum(total + total_spread, 0),
+        'slope': slope,
+        'sigma': sigma,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Forecasts -> optimizer inputs
+# ---------------------------------------------------------------------------
+
+def forecast_slot_demand(hourly_tib, horizon_hours: int = HOURS_PER_MONTH, start_phase: int = 0,
+                         interval: float = 0.9, conservative: bool = False):
+    """
+    Next-period query demand (TiB) per project for `optimize_slots`.
+
+    Args:
+        hourly_tib (np.ndarray): TiB processed per hour, shape (projects, hours).
+        conservative (bool): Use the upper prediction bound instead of the point forecast.
+
+    Returns:
+        list: One `query_demand` value per project.
+    """
+    result = forecast(hourly_tib, horizon_hours, HOURS_PER_WEEK, interval, start_phase)
+    return np.round(result['total_upper' if conservative else 'total'], 2).tolist()
+
+
+def forecast_storage_datasets(daily_size_gb, daily_access_gb, high_freq, horizon_days: int = 30,
+                              start_phase: int = 0, interval: float = 0.9, conservative: bool = False):
+    """
+    Next-month datasets for `optimize_gcs_storage`, one per bucket (or prefix).
+
+    Storage is billed on the average size over the month and retrieval on the GB
+    read, so 'size' is the mean forecast size and 'access' the forecast total reads.
+
+    Args:
+        daily_size_gb (np.ndarray): Stored GB per day, shape (buckets, days).
+        daily_access_gb (np.ndarray): GB retrieved per day, shape (buckets, days).
+        high_freq (Iterable): Whether each bucket must stay in Standard/Nearline.
+        conservative (bool): Use the upper prediction bounds.
+
+    Returns:
+        list: Dicts with 'size', 'access' and 'high_freq'.
+    """
+    size = forecast(daily_size_gb, horizon_days, 7, interval, start_phase)
+    access = forecast(daily_access_gb, horizon_days, 7, interval, start_phase)
+    sizes = (size['upper'] if conservative else size['point']).mean(axis=1)
+    accesses = access['total_upper' if conservative else 'total']
+    return [
+        {'size': round(float(s), 1), 'access': round(float(a), 1), 'high_freq': bool(h)}
+        for s, a, h in zip(sizes, accesses, high_freq)
+    ]
+
+
+def forecast_vm_pools(hourly_vcpus, horizon_hours: int = HOURS_PER_WEEK, start_phase: int = 0,
+                      interval: float = 0.9):
+    """
+    Next-period pool sizes for `optimize_vm_cost`, one per instance group.
+
+    The pool must cover the upper bound of the hourly forecast. vCPUs above the
+    lowest forecast level are only needed part of the time, so they are the ones
+    allowed to run on spot VMs.
+
+    Args:
+        hourly_vcpus (np.ndarray): vCPUs in use per hour, shape (groups, hours).
+
+    Returns:
+        list: Dicts with 'total_vcpus' and 'max_spot_vcpus'.
+    """
+    result = forecast(hourly_vcpus, horizon_hours, HOURS_PER_WEEK, interval, start_phase)
+    peak = np.ceil(result['upper'].max(axis=1)).astype(int)
+    floor = np.floor(result['lower'].min(axis=1)).astype(int)
+    return [
+        {'total_vcpus': int(p), 'max_spot_vcpus': int(max(p - f, 0))}
+        for p, f in zip(peak, floor)
+    ]
+
+
+@cached()
+def get_hourly_bigquery_demand(days_back: int = 28, project_id: str = PROJECT_ID, region: str = REGION):
+    """
+    Fetches TiB processed and slot-hours consumed per hour by query jobs over the
+    last `days_back` days from INFORMATION_SCHEMA.JOBS_BY_PROJECT.
+
+    Returns:
+        dict: 'query_tib' and 'slot_hours' arrays with one value per hour (hours
+        without jobs are 0) and 'start_phase', the hour of the week (UTC) of the first value.
+    """
+    # UTC throughout: TIMESTAMP() reads a string without an offset as UTC, and
+    # creation_time is truncated to UTC hours
+    end_time = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_time = end_time - timedelta(days=days_back)
+
+    query = f"""
+    SELECT
+        TIMESTAMP_TRUNC(creation_time, HOUR) AS hour,
+        SUM(total_bytes_processed) / POWER(1024, 4) AS query_tib,
+        SUM(total_slot_ms) / (1000 * 60 * 60) AS slot_hours
+    FROM
+        `{project_id}`.`region-{region}`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
+    WHERE
+        creation_time >= TIMESTAMP('{start_time.isoformat()}')
+        AND creation_time < TIMESTAMP('{end_time.isoformat()}')
+        AND state = 'DONE'
+        AND job_type = 'QUERY'
+    GROUP BY hour
+    """
+    hours = days_back * 24
+    query_tib = np.zeros(hours)
+    slot_hours = np.zeros(hours)
+    for row in bigquery_client(project_id).query(query).result():
+        index = int((row.hour - start_time).total_seconds() // 3600)
+        if 0 <= index < hours:
+            query_tib[index] = float(row.query_tib or 0)
+            slot_hours[index] = float(row.slot_hours or 0)
+    return {
+        'query_tib': query_tib,
+        'slot_hours': slot_hours,
+        'start_phase': start_time.weekday() * 24 + start_time.hour,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Forecast next-period BigQuery, GCS and VM demand.')
+    parser.add_argument('--synthetic', type=int, help='Forecast this many generated hourly series instead')
+    parser.add_argument('--days-back', type=int, default=28)
+    parser.add_argument('--horizon-hours', type=int, default=HOURS_PER_MONTH)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from benchmarks.generators import vm_demand_curves
+        history = vm_demand_curves(seed=args.seed, num_groups=args.synthetic, hours=args.days_back * 24)
+        started = time.perf_counter()
+        result = forecast(history, args.horizon_hours)
+        print(f'#### Forecast {args.synthetic} hourly series x {args.horizon_hours} hours in '
+              f'{time.perf_counter() - started:.2f}s')
+        print('#### First pools :: ', forecast_vm_pools(history[:3]))
+    else:
+        from bigquery.optimize_bigquery_slots import optimize_slots
+
+        demand = get_hourly_bigquery_demand(args.days_back)
+        result = forecast(demand['query_tib'], args.horizon_hours, start_phase=demand['start_phase'])
+        query_demand = round(float(result['total'][0]), 2)
+        print(f"#### Forecast TiB for the next {args.horizon_hours} hours :: {query_demand} "
+              f"({result['total_lower'][0]:.2f} - {result['total_upper'][0]:.2f})")
+        print('------------------------------------------------------------- ')
+        optimize_slots(query_demand)
@@ -0,0 +1,118 @@
+import threading
+from config import (GCP_CLIENT_MODE, REPLAY_DIR, REPLAY_LATENCY_MS, REPLAY_PAGE_SIZE,
+                    SERVICE_ACCOUNT_KEY)
+import gcp_replay
+
+MODES = ('live', 'record', 'replay')
+
+_clients = {}
+_lock = threading.Lock()
+_store = None
+_settings = {
+    'mode': GCP_CLIENT_MODE,
+    'replay_dir': REPLAY_DIR,
+    'page_size': REPLAY_PAGE_SIZE,
+    'latency_s': REPLAY_LATENCY_MS / 1000,
+}
+
+
+def configure(mode: str = None, replay_dir=None, page_size: int = None, latency_ms: float = None):
+    """
+    Switch how the data-gathering functions reach GCP.
+
+    Defaults come from config (GCP_CLIENT_MODE, GCP_REPLAY_DIR, GCP_REPLAY_PAGE_SIZE
+    and GCP_REPLAY_LATENCY_MS environment variables). Clients created earlier are dropped.
+
+    Args:
+        mode (str): 'live' uses the real clients, 'record' uses them and saves every
+            response under `replay_dir`, 'replay' serves the saved responses offline.
+        replay_dir: Directory holding the recordings.
+        page_size (int): Records per page when replaying.
+        latency_ms (float): Delay injected before every replayed page or download.
+
+    Raises:
+        ValueError: If `mode` is not one of `MODES`.
+    """
+    global _store
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Unknown GCP client mode '{mode}'. Choose from: {', '.join(MODES)}")
+    with _lock:
+        for key, value in (('mode', mode), ('replay_dir', replay_dir), ('page_size', page_size)):
+            if value is not None:
+                _settings[key] = value
+        if latency_ms is not None:
+            _settings['latency_s'] = latency_ms / 1000
+        _clients.clear()
+        _store = None
+
+
+def _replay_store():
+    global _store
+    if _store is None:
+        _store = gcp_replay.ReplayStore(_settings['replay_dir'])
+    return _store
+
+
+def _credentials():
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_KEY)
+
+
+def _client(kind, project, create_live, replay_cls, recording_cls):
+    """
+    Return the cached client for (kind, project), creating it for the current mode.
+    """
+    with _lock:
+        key = (kind, project)
+        if key not in _clients:
+            mode = _settings['mode']
+            if mode == 'replay':
+                _clients[key] = replay_cls(_replay_store(), project=project, page_size=_settings['page_size'],
+                                           latency_s=_settings['latency_s'])
+            elif mode == 'record':
+                _clients[key] = recording_cls(create_live(), _replay_store())
+            else:
+                _clients[key] = create_live()
+        return _clients[key]
+
+
+def bigquery_client(project: str = None, default_credentials: bool = False):
+    """
+    BigQuery client authenticated with the service account key (see config.SERVICE_ACCOUNT_KEY).
+
+    Args:
+        project (str): Project to run jobs in; defaults to the key's project.
+        default_credentials (bool): Use the application default credentials instead
+            of the key, like a plain `bigquery.Client()`.
+    """
+    def create_live():
+        from google.cloud import bigquery
+        if default_credentials:
+            return bigquery.Client(project=project)
+        return bigquery.Client(credentials=_credentials(), project=project)
+    # Separate cache entries: the two clients authenticate as different principals
+    kind = 'bigquery-adc' if default_credentials else 'bigquery'
+    return _client(kind, project, create_live, gcp_replay.ReplayBigQueryClient,
+                   gcp_replay.RecordingBigQueryClient)
+
+
+def storage_client(project: str = None):
+    """
+    Cloud Storage client using the application default credentials.
+    """
+    def create_live():
+        from google.cloud import storage
+        return storage.Client(project=project)
+    return _client('storage', project, create_live, gcp_replay.ReplayStorageClient,
+                   gcp_replay.RecordingStorageClient)
+
+
+def logging_client(project: str = None):
+    """
+    Cloud Logging client using the application default credentials.
+    """
+    def create_live():
+        from google.cloud import logging_v2
+        return logging_v2.Client(project=project)
+    return _client('logging', project, create_live, gcp_replay.ReplayLoggingClient,
+                   gcp_replay.RecordingLoggingClient)
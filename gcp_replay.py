@@ -0,0 +1,452 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, time as time_of_day, timezone
+from decimal import Decimal
+
+# Timestamps in SQL and log filters move with every run (CURRENT_TIMESTAMP,
+# datetime.now()); they are blanked so a recording keeps matching its request.
+# Their distance from the first timestamp is kept, so a 7-day window does not
+# replay the recording of a 30-day one.
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?")
+
+
+def _utc_naive(text):
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def request_key(text: str):
+    """
+    Stable file key for a request: whitespace collapsed, hashed, and timestamps
+    blanked except for their offset in minutes from the first one ('?', '?+43200m').
+    """
+    first = None
+
+    def blank(match):
+        nonlocal first
+        moment = _utc_naive(match.group(0))
+        if first is None:
+            first = moment
+            return '?'
+        return f'?{round((moment - first).total_seconds() / 60):+d}m'
+
+    normalized = ' '.join(TIMESTAMP_PATTERN.sub(blank, text).split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:20]
+
+
+# BigQuery column types JSON has no type for, as {"$<tag>": text}.
+# datetime before date: a datetime is also a date.
+_ENCODINGS = (
+    (datetime, '$dt', datetime.isoformat, datetime.fromisoformat),                     # TIMESTAMP, DATETIME
+    (date, '$date', date.isoformat, date.fromisoformat),                               # DATE
+    (time_of_day, '$time', time_of_day.isoformat, time_of_day.fromisoformat),          # TIME
+    (Decimal, '$dec', str, Decimal),                                                   # NUMERIC, BIGNUMERIC
+    (bytes, '$b64', lambda v: base64.b64encode(v).decode('ascii'), base64.b64decode),  # BYTES
+)
+_DECODERS = {tag: decode for _, tag, _, decode in _ENCODINGS}
+
+
+def _encode(value):
+    for value_type, tag, encode, _ in _ENCODINGS:
+        if isinstance(value, value_type):
+            return {tag: encode(value)}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and len(value) == 1:
+        tag, text = next(iter(value.items()))
+        if tag in _DECODERS:
+            return _DECODERS[tag](text)
+    return value
+
+
+class ReplayStore:
+    """
+    Recordings on disk, one gzipped JSON-lines file per request.
+
+    The first line of a file is a header with the request and the column names;
+    every following line is one record as a compact JSON array, e.g.
+
+        replay_data/bigquery/<key>.jsonl.gz
+        {"request": "SELECT ...", "columns": ["creation_time", "total_slot_ms", ...]}
+        [{"$dt": "2025-01-01T09:00:00+00:00"}, 5021, ...]
+
+    Downloaded object contents are stored as gzipped bytes under `objects/`.
+    Decoded recordings are kept in memory after the first read.
+    """
+    def __init__(self, root):
+        self.root = str(root)
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _path(self, kind, key, suffix='.jsonl.gz'):
+        return os.path.join(self.root, kind, key + suffix)
+
+    def save(self, kind, request, columns, records):
+        """
+        Write `records` (sequences of values in `columns` order) for `request`.
+        """
+        path = self._path(kind, request_key(request))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, 'wt', encoding='utf-8') as recording:
+            recording.write(json.dumps({'request': request, 'columns': list(columns)}) + '\n')
+            for record in records:
+                recording.write(json.dumps([_encode(v) for v in record], separators=(',', ':')) + '\n')
+        with self._lock:
+            self._loaded.pop((kind, request_key(request)), None)
+
+    def load(self, kind, request):
+        """
+        Return (columns, records) recorded for `request`.
+
+        Raises:
+            LookupError: If there is no recording for the request.
+        """
+        key = (kind, request_key(request))
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+        path = self._path(*key)
+        if not os.path.exists(path):
+            raise LookupError(f'No {kind} recording for request {request!r} in {self.root}; '
+                              f'run once with GCP_CLIENT_MODE=record to create it')
+        with gzip.open(path, 'rt', encoding='utf-8') as recording:
+            columns = json.loads(recording.readline())['columns']
+            records = [[_decode(v) for v in json.loads(line)] for line in recording]
+        with self._lock:
+            self._loaded[key] = (columns, records)
+        return columns, records
+
+    def save_bytes(self, request, data: bytes):
+        path = self._path('objects', request_key(request), '.bin.gz')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, 'wb') as recording:
+            recording.write(data)
+
+    def load_bytes(self, request):
+        path = self._path('objects', request_key(request), '.bin.gz')
+        if not os.path.exists(path):
+            raise LookupError(f'No object recording for {request!r} in {self.root}; '
+                              f'run once with GCP_CLIENT_MODE=record to create it')
+        with gzip.open(path, 'rb') as recording:
+            return recording.read()
+
+
+def _unchanged(record):
+    return record
+
+
+class Pager:
+    """
+    Serves recorded records in pages, sleeping `latency_s` before each page to
+    stand in for the network round-trip. Iterating yields records; `pages` yields lists.
+    """
+    def __init__(self, records, page_size, latency_s, wrap):
+        self._records = records
+        self._page_size = max(int(page_size), 1)
+        self._latency_s = latency_s
+        self._wrap = wrap
+        self.total_rows = len(records)
+
+    @property
+    def pages(self):
+        for start in range(0, len(self._records), self._page_size):
+            if self._latency_s:
+                time.sleep(self._latency_s)
+            yield [self._wrap(r) for r in self._records[start:start + self._page_size]]
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page
+
+
+# ---------------------------------------------------------------------------
+# BigQuery
+# ---------------------------------------------------------------------------
+
+class ReplayRow:
+    """
+    Row with attribute, key and index access, like google.cloud.bigquery.Row.
+    """
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values, index):
+        self._values = values
+        self._index = index
+
+    def __getattr__(self, name):
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else self._values[index]
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self):
+        return tuple(self._values)
+
+    def items(self):
+        return ((name, self._values[i]) for name, i in self._index.items())
+
+    def __repr__(self):
+        return f'ReplayRow({dict(self.items())})'
+
+
+class ReplayQueryJob:
+    def __init__(self, client, query):
+        self._client = client
+        self.query = query
+
+    def result(self, page_size=None, **kwargs):
+        columns, records = self._client.store.load('bigquery', self.query)
+        index = {name: i for i, name in enumerate(columns)}
+        return Pager(records, page_size or self._client.page_size, self._client.latency_s,
+                     lambda values: ReplayRow(values, index))
+
+
+class ReplayBigQueryClient:
+    """
+    Stand-in for google.cloud.bigquery.Client that answers `query()` from recordings.
+    """
+    def __init__(self, store, project=None, page_size=1000, latency_s=0.0):
+        self.store = store
+        self.project = project
+        self.page_size = page_size
+        self.latency_s = latency_s
+
+    def query(self, query, **kwargs):
+        return ReplayQueryJob(self, query)
+
+
+class RecordingQueryJob:
+    def __init__(self, job, store):
+        self._job = job
+        self._store = store
+
+    def __getattr__(self, name):
+        return getattr(self._job, name)
+
+    def result(self, **kwargs):
+        iterator = self._job.result(**kwargs)
+        rows = list(iterator)
+        columns = list(rows[0].keys()) if rows else [field.name for field in (iterator.schema or [])]
+        self._store.save('bigquery', self._job.query, columns, [row.values() for row in rows])
+        # Same interface as the replayed result: iteration, `pages` and `total_rows`
+        return Pager(rows, kwargs.get('page_size') or len(rows), 0.0, _unchanged)
+
+
+class RecordingBigQueryClient:
+    """
+    Wraps a real BigQuery client and saves every query result it returns.
+    """
+    def __init__(self, client, store):
+        self._client = client
+        self._store = store
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def query(self, query, **kwargs):
+        return RecordingQueryJob(self._client.query(query, **kwargs), self._store)
+
+
+# ---------------------------------------------------------------------------
+# Cloud Storage
+# ---------------------------------------------------------------------------
+
+BLOB_COLUMNS = ['name', 'size', 'storage_class', 'updated', 'content_type']
+
+
+class ReplayBlob:
+    def __init__(self, bucket, values):
+        self.bucket = bucket
+        self.name, self.size, self.storage_class, self.updated, self.content_type = values
+
+    def download_as_bytes(self, **kwargs):
+        if self.bucket.client.latency_s:
+            time.sleep(self.bucket.client.latency_s)
+        return self.bucket.client.store.load_bytes(f'{self.bucket.name}/{self.name}')
+
+    download_as_string = download_as_bytes
+
+
+class ReplayBucket:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def list_blobs(self, prefix=None, page_size=None, **kwargs):
+        _, records = self.client.store.load('storage', f'{self.name}/{prefix or ""}')
+        return Pager(records, page_size or self.client.page_size, self.client.latency_s,
+                     lambda values: ReplayBlob(self, values))
+
+    def get_blob(self, blob_name, **kwargs):
+        _, records = self.client.store.load('storage', f'{self.name}/{blob_name}')
+        return ReplayBlob(self, records[0]) if records else None
+
+    blob = get_blob
+
+
+class ReplayStorageClient:
+    """
+    Stand-in for google.cloud.storage.Client serving blob listings and contents from recordings.
+    """
+    def __init__(self, store, project=None, page_size=1000, latency_s=0.0):
+        self.store = store
+        self.project = project
+        self.page_size = page_size
+        self.latency_s = latency_s
+
+    def bucket(self, bucket_name):
+        return ReplayBucket(self, bucket_name)
+
+    get_bucket = bucket
+
+    def list_blobs(self, bucket_or_name, prefix=None, **kwargs):
+        name = getattr(bucket_or_name, 'name', bucket_or_name)
+        return self.bucket(name).list_blobs(prefix=prefix, **kwargs)
+
+
+def _blob_record(blob):
+    return [blob.name, blob.size, blob.storage_class, blob.updated, blob.content_type]
+
+
+class RecordingBucket:
+    def __init__(self, bucket, store):
+        self._bucket = bucket
+        self._store = store
+
+    def __getattr__(self, name):
+        return getattr(self._bucket, name)
+
+    def list_blobs(self, prefix=None, **kwargs):
+        blobs = list(self._bucket.list_blobs(prefix=prefix, **kwargs))
+        self._store.save('storage', f'{self._bucket.name}/{prefix or ""}', BLOB_COLUMNS,
+                         [_blob_record(blob) for blob in blobs])
+        return Pager(blobs, kwargs.get('page_size') or len(blobs), 0.0, _unchanged)
+
+    def get_blob(self, blob_name, **kwargs):
+        blob = self._bucket.get_blob(blob_name, **kwargs)
+        self._store.save('storage', f'{self._bucket.name}/{blob_name}', BLOB_COLUMNS,
+                         [_blob_record(blob)] if blob else [])
+        if blob is not None:
+            self._store.save_bytes(f'{self._bucket.name}/{blob_name}', blob.download_as_bytes())
+        return blob
+
+    blob = get_blob
+
+
+class RecordingStorageClient:
+    """
+    Wraps a real storage client and saves the blob listings and blob contents it returns.
+    """
+    def __init__(self, client, store):
+        self._client = client
+        self._store = store
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def bucket(self, bucket_name, *args, **kwargs):
+        return RecordingBucket(self._client.bucket(bucket_name, *args, **kwargs), self._store)
+
+    def get_bucket(self, bucket_or_name, *args, **kwargs):
+        return RecordingBucket(self._client.get_bucket(bucket_or_name, *args, **kwargs), self._store)
+
+    def list_blobs(self, bucket_or_name, prefix=None, **kwargs):
+        name = getattr(bucket_or_name, 'name', bucket_or_name)
+        return self.bucket(name).list_blobs(prefix=prefix, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Cloud Logging
+# ---------------------------------------------------------------------------
+
+ENTRY_COLUMNS = ['timestamp', 'log_name', 'payload']
+
+
+class ReplayLogEntry:
+    __slots__ = ('timestamp', 'log_name', 'payload')
+
+    def __init__(self, values):
+        self.timestamp, self.log_name, self.payload = values
+
+
+class ReplayLogger:
+    """
+    Logger whose writes are dropped, so code that writes logs runs offline.
+    Also serves as its own batch (`with logger.batch() as batch: ...`).
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def _drop(self, *args, **kwargs):
+        pass
+
+    log = log_text = log_struct = log_proto = delete = commit = _drop
+
+    def batch(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class ReplayLoggingClient:
+    """
+    Stand-in for google.cloud.logging_v2.Client serving `list_entries()` from recordings.
+    """
+    def __init__(self, store, project=None, page_size=1000, latency_s=0.0):
+        self.store = store
+        self.project = project
+        self.page_size = page_size
+        self.latency_s = latency_s
+
+    def list_entries(self, filter_=None, page_size=None, **kwargs):
+        _, records = self.store.load('logging', f'{self.project}|{filter_ or ""}')
+        return Pager(records, page_size or self.page_size, self.latency_s, ReplayLogEntry)
+
+    def logger(self, name, **kwargs):
+        return ReplayLogger(name)
+
+
+class RecordingLoggingClient:
+    """
+    Wraps a real logging client and saves the entries `list_entries()` returns.
+    """
+    def __init__(self, client, store):
+        self._client = client
+        self._store = store
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def list_entries(self, filter_=None, **kwargs):
+        entries = list(self._client.list_entries(filter_=filter_, **kwargs))
+        self._store.save('logging', f'{self._client.project}|{filter_ or ""}', ENTRY_COLUMNS,
+                         [[entry.timestamp, entry.log_name,
+                           entry.payload if isinstance(entry.payload, (dict, str)) else dict(entry.payload)]
+                          for entry in entries])
+        return Pager(entries, kwargs.get('page_size') or len(entries), 0.0, _unchanged)
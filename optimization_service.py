@@ -0,0 +1,229 @@
+# uvicorn optimization_service:app --port 8080
+
+import asyncio
+import functools
+import importlib
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field, field_validator
+from config import SERVICE_SOLVER_WORKERS
+from bigquery.bigquery_byte_scanned import get_query_demand
+from bigquery.optimize_bigquery_slots import solve_slots
+from optimize_gcs_storage import optimize_gcs_storage, BUDGET
+from schedule_queries import schedule_queries
+from vm_cost_optimization import optimize_vm_cost
+from solver_backends import LP_ONLY_BACKENDS, normalize_backend
+from structured_logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+class SolverOptions(BaseModel):
+    backend: Optional[str] = None  # None keeps the optimizer's default backend
+    time_limit_s: float = Field(0, ge=0)
+    relative_gap: float = Field(0, ge=0)
+    num_workers: int = Field(0, ge=0)
+
+    @field_validator('backend')
+    @classmethod
+    def check_backend(cls, backend):
+        # Unknown backends are a 422 here instead of a ValueError inside the worker.
+        # Every endpoint solves a MIP, so LP-only backends are refused as well.
+        if backend is None:
+            return None
+        name = normalize_backend(backend)
+        if name in LP_ONLY_BACKENDS:
+            raise ValueError(f"Solver backend '{backend}' only solves LPs and cannot solve this MIP")
+        return name
+
+
+class Dataset(BaseModel):
+    size: float = Field(ge=0)  # GB
+    access: float = Field(ge=0)  # GB retrieved per month
+    high_freq: bool = False
+
+
+class StorageClass(BaseModel):
+    name: str
+    storage_cost: float = Field(ge=0)  # $/GB
+    retrieval_cost: float = Field(ge=0)  # $/GB
+
+
+class Query(BaseModel):
+    data_scanned: float = Field(ge=0)  # TB
+    slots_required: float = Field(ge=0)
+    runtime: int = Field(ge=1)  # hours
+    deadline: int = Field(ge=0)  # time slot
+
+
+class SlotRequest(SolverOptions):
+    query_demand: Optional[float] = Field(None, ge=0)  # TiB; defaults to the cached last-30-days demand
+    max_slots: int = Field(50, ge=1)
+
+
+class StorageRequest(SolverOptions):
+    datasets: Optional[List[Dataset]] = None
+    # Standard, Nearline, Coldline, Archive in this order
+    storage_classes: Optional[List[StorageClass]] = Field(None, min_length=4, max_length=4)
+    budget: float = Field(BUDGET, ge=0)
+
+
+class VMRequest(SolverOptions):
+    total_vcpus: int = Field(100, ge=1)
+    max_spot_vcpus: int = Field(50, ge=0)
+    standard_cost: float = Field(0.04, ge=0)
+    cud_discount: float = Field(0.012, ge=0)
+    spot_cost: float = Field(0.01, ge=0)
+
+
+class ScheduleRequest(SolverOptions):
+    queries: Optional[List[Query]] = None
+    time_slots: int = Field(9, ge=1)
+    on_demand_cost: float = Field(5.0, ge=0)
+    flat_rate_cost: float = Field(4.0, ge=0)
+    max_slots: int = Field(100, ge=1)
+
+
+# Modules each solver worker imports once at start-up, so requests never pay for loading OR-Tools
+WARM_MODULES = (
+    'ortools.linear_solver.pywraplp',
+    'bigquery.optimize_bigquery_slots',
+    'optimize_gcs_storage',
+    'schedule_queries',
+    'vm_cost_optimization',
+)
+
+
+def _create_pool():
+    # spawn: forking a process that already runs an event loop and gRPC threads is unsafe
+    return ProcessPoolExecutor(
+        max_workers=SERVICE_SOLVER_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_warm_worker,
+    )
+
+
+def _warm_worker():
+    """
+    Import the optimizer modules in a solver worker process and start its log writer.
+    """
+    importlib.import_module('structured_logging').setup_logging()
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+
+
+# Solves currently running, keyed by endpoint + canonical JSON of the inputs, with
+# the pool each one runs on. Identical concurrent requests await the same future
+# instead of solving twice.
+_inflight = {}
+
+
+async def _solve(name, func, **kwargs):
+    """
+    Run `func(**kwargs)` in the solver pool, coalescing identical in-flight requests.
+
+    A worker that dies (e.g. killed by the OOM killer) breaks the whole pool; the
+    pool is then replaced so later requests are served again, and the requests
+    that were running on it get a 503.
+    """
+    key = name + json.dumps(kwargs, sort_keys=True)
+    future, pool = _inflight.get(key, (None, None))
+    if future is None:
+        loop = asyncio.get_running_loop()
+        pool = app.state.pool
+        # partial of a module-level function pickles by reference, so workers only
+        # import the optimizer's own module
+        try:
+            future = loop.run_in_executor(pool, functools.partial(func, **kwargs))
+        except BrokenProcessPool:
+            _replace_pool(pool)
+            raise HTTPException(status_code=503, detail='Solver pool restarted, retry the request')
+        _inflight[key] = future, pool
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    try:
+        # shield: a cancelled client must not cancel the solve other callers are waiting on
+        return await asyncio.shield(future)
+    except BrokenProcessPool:
+        _replace_pool(pool)
+        raise HTTPException(status_code=503, detail='Solver worker crashed, retry the request')
+
+
+def _replace_pool(broken):
+    """
+    Swap in a fresh solver pool unless another request already replaced `broken`.
+    """
+    if app.state.pool is broken:
+        logger.error('Solver pool broken, starting a new one')
+        app.state.pool = _create_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    app.state.pool = _create_pool()
+    # Start every worker now so the first requests do not pay the OR-Tools import
+    await asyncio.gather(*[
+        asyncio.get_running_loop().run_in_executor(app.state.pool, _warm_worker)
+        for _ in range(SERVICE_SOLVER_WORKERS)
+    ])
+    yield
+    app.state.pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(title="GCP Cost Optimization Service", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    return {'status': 'ok', 'inflight': len(_inflight)}
+
+
+@app.post("/optimize/slots")
+async def slots(request: SlotRequest):
+    """
+    Recommend flat-rate slots vs on-demand TiB (see `solve_slots`). Like the other
+    endpoints, a solve without a solution is reported in 'status', not as an error.
+    """
+    query_demand = request.query_demand
+    if query_demand is None:
+        # Served from bigquery.data_cache after the first call
+        query_demand = await asyncio.to_thread(get_query_demand)
+    options = request.model_dump(exclude={'query_demand'}, exclude_none=True)
+    result = await _solve('slots', solve_slots, query_demand=query_demand, **options)
+    return {'query_demand': query_demand, **result}
+
+
+@app.post("/optimize/storage")
+async def storage(request: StorageRequest):
+    """
+    Assign datasets to GCS storage classes (see `optimize_gcs_storage`).
+    """
+    return await _solve('storage', optimize_gcs_storage, **request.model_dump(exclude_none=True))
+
+
+@app.post("/optimize/vm")
+async def vm(request: VMRequest):
+    """
+    Split a vCPU pool between standard, CUD and spot (see `optimize_vm_cost`).
+    """
+    return await _solve('vm', optimize_vm_cost, **request.model_dump(exclude_none=True))
+
+
+@app.post("/optimize/schedule")
+async def schedule(request: ScheduleRequest):
+    """
+    Schedule queries and choose their pricing model (see `schedule_queries`).
+    """
+    return await _solve('schedule', schedule_queries, **request.model_dump(exclude_none=True))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8080)
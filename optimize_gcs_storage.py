@@ -1,75 +1,128 @@
+import logging
 from ortools.linear_solver import pywraplp
+from solver_telemetry import build_phase, solve
+from solver_backends import create_solver, solver_parameters
+
+logger = logging.getLogger(__name__)
+
+# Problem data
+DATASETS = [
+    {'size': 1000, 'access': 100, 'high_freq': True},  # Dataset 1
+    {'size': 5000, 'access': 50, 'high_freq': False},  # Dataset 2
+    {'size': 10000, 'access': 10, 'high_freq': False}  # Dataset 3
+]
+# 20 + 100 + 200 = $320
+STORAGE_CLASSES = [
+    {'name': 'Standard', 'storage_cost': 0.020, 'retrieval_cost': 0.0},  # $0.020/GB, $0/GB
+    {'name': 'Nearline', 'storage_cost': 0.010, 'retrieval_cost': 0.01}, # $0.010/GB, $0.01/GB
+    {'name': 'Coldline', 'storage_cost': 0.004, 'retrieval_cost': 0.02}, # $0.004/GB, $0.02/GB
+    {'name': 'Archive', 'storage_cost': 0.0012, 'retrieval_cost': 0.05} # $0.0012/GB, $0.05/GB
+]
+BUDGET = 250.0  # $250/month
+
+def optimize_gcs_storage(datasets: list = None, storage_classes: list = None, budget: float = BUDGET,
+                         backend: str = 'SCIP', time_limit_s: float = 0, relative_gap: float = 0,
+                         num_workers: int = 0):
+    """
+    Assign each dataset to the GCS storage class that minimizes total monthly cost.
+
+    Args:
+        datasets (list): Dicts with 'size' (GB), 'access' (GB retrieved per month) and
+            'high_freq' (bool; such datasets may only use Standard or Nearline).
+            Defaults to `DATASETS`.
+        storage_classes (list): Dicts with 'name', 'storage_cost' ($/GB) and
+            'retrieval_cost' ($/GB), in the order Standard, Nearline, Coldline, Archive.
+            Defaults to `STORAGE_CLASSES`.
+        budget (float): Maximum total monthly cost in USD.
+        backend (str): MIP solver backend: 'SCIP', 'CBC', 'CP-SAT' or 'HIGHS'.
+        time_limit_s (float): Solver time limit in seconds; 0 means no limit.
+        relative_gap (float): Relative MIP gap at which to stop; 0 keeps the solver default.
+        num_workers (int): Solver threads; 0 keeps the solver default.
+
+    Returns:
+        dict: 'status' ('OPTIMAL', 'FEASIBLE' or 'NOT_SOLVED'), 'total_cost' and one
+        'assignments' entry per dataset, or None if the solver could not be created.
+
+    Raises:
+        ValueError: If `backend` is unknown or LP-only (see `solver_backends.create_solver`).
+    """
+    datasets = DATASETS if datasets is None else datasets
+    storage_classes = STORAGE_CLASSES if storage_classes is None else storage_classes
 
-def optimize_gcs_storage():
     # Create the MIP solver
-    solver = pywraplp.Solver.CreateSolver('SCIP')
+    solver = create_solver(backend, time_limit_s, num_workers)
     if not solver:
-        print("Solver not created.")
+        logger.error('Solver not created', extra={'data': {'backend': backend}})
         return
 
-    # Problem data
-    datasets = [
-        {'size': 1000, 'access': 100, 'high_freq': True},  # Dataset 1
-        {'size': 5000, 'access': 50, 'high_freq': False},  # Dataset 2
-        {'size': 10000, 'access': 10, 'high_freq': False}  # Dataset 3
-    ]
-    # 20 + 100 + 200 = $320
-    storage_classes = [
-        {'name': 'Standard', 'storage_cost': 0.020, 'retrieval_cost': 0.0},  # $0.020/GB, $0/GB
-        {'name': 'Nearline', 'storage_cost': 0.010, 'retrieval_cost': 0.01}, # $0.010/GB, $0.01/GB
-        {'name': 'Coldline', 'storage_cost': 0.004, 'retrieval_cost': 0.02}, # $0.004/GB, $0.02/GB
-        {'name': 'Archive', 'storage_cost': 0.0012, 'retrieval_cost': 0.05} # $0.0012/GB, $0.05/GB
-    ]
-    budget = 250.0  # $250/month
-    num_datasets = len(datasets)
-    num_classes = len(storage_classes)
-
-    # Variables: x[i][j] = 1 if dataset i is in storage class j, 0 otherwise
-    x = [[solver.BoolVar(f'x[{i}][{j}]') for j in range(num_classes)]
-         for i in range(num_datasets)]
+    with build_phase('optimize_gcs_storage', solver):
+        num_datasets = len(datasets)
+        num_classes = len(storage_classes)
+
+        # Variables: x[i][j] = 1 if dataset i is in storage class j, 0 otherwise
+        x = [[solver.BoolVar(f'x[{i}][{j}]') for j in range(num_classes)]
+             for i in range(num_datasets)]
     
-    # print("x :: ", x)
-    # for i in range(num_datasets):
-    #     for j in range(num_classes):
-    #         print("X i j", x[{i}][{j}])
+        # print("x :: ", x)
+        # for i in range(num_datasets):
+        #     for j in range(num_classes):
+        #         print("X i j", x[{i}][{j}])
 
 
    
-    # Constraints
-    # 1. Each dataset is assigned to exactly one storage class
-    for i in range(num_datasets):
-        solver.Add(sum(x[i][j] for j in range(num_classes)) == 1)
-
-    # 2. High-frequency datasets (Dataset 1) can only use Standard or Nearline
-    for i in range(num_datasets):
-        if datasets[i]['high_freq']:
-            solver.Add(x[i][2] == 0)  # No Coldline
-            solver.Add(x[i][3] == 0)  # No Archive
-
-    # 3. Budget constraint
-    total_cost = 0
-    for i in range(num_datasets):
-        for j in range(num_classes):
-            storage_cost = datasets[i]['size'] * storage_classes[j]['storage_cost']
-            retrieval_cost = datasets[i]['access'] * storage_classes[j]['retrieval_cost']
-            total_cost += x[i][j] * (storage_cost + retrieval_cost)
-    solver.Add(total_cost <= budget)
-
-    # Objective: Minimize total cost
-    solver.Minimize(total_cost)
+        # Constraints
+        # 1. Each dataset is assigned to exactly one storage class
+        for i in range(num_datasets):
+            solver.Add(sum(x[i][j] for j in range(num_classes)) == 1)
+
+        # 2. High-frequency datasets (Dataset 1) can only use Standard or Nearline
+        for i in range(num_datasets):
+            if datasets[i]['high_freq']:
+                solver.Add(x[i][2] == 0)  # No Coldline
+                solver.Add(x[i][3] == 0)  # No Archive
+
+        # 3. Budget constraint
+        total_cost = 0
+        for i in range(num_datasets):
+            for j in range(num_classes):
+                storage_cost = datasets[i]['size'] * storage_classes[j]['storage_cost']
+                retrieval_cost = datasets[i]['access'] * storage_classes[j]['retrieval_cost']
+                total_cost += x[i][j] * (storage_cost + retrieval_cost)
+        solver.Add(total_cost <= budget)
+
+        # Objective: Minimize total cost
+        solver.Minimize(total_cost)
 
     # Solve
-    status = solver.Solve()
-    if status == pywraplp.Solver.OPTIMAL:
-        print(f'Optimal solution found. Total cost: ${solver.Objective().Value():.2f}/month')
+    status = solve('optimize_gcs_storage', solver, solver_parameters(relative_gap), backend)
+    # FEASIBLE: stopped early by time_limit_s / relative_gap with a usable solution
+    if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        assignments = []
         for i in range(num_datasets):
             for j in range(num_classes):
                 if x[i][j].solution_value() > 0.5:
-                    print(f"Dataset {i+1}: {storage_classes[j]['name']}, "
-                          f"Storage cost: ${datasets[i]['size'] * storage_classes[j]['storage_cost']:.2f}, "
-                          f"Retrieval cost: ${datasets[i]['access'] * storage_classes[j]['retrieval_cost']:.2f}")
+                    storage_cost = datasets[i]['size'] * storage_classes[j]['storage_cost']
+                    retrieval_cost = datasets[i]['access'] * storage_classes[j]['retrieval_cost']
+                    assignments.append({
+                        'dataset': i + 1,
+                        'storage_class': storage_classes[j]['name'],
+                        'storage_cost': round(storage_cost, 2),
+                        'retrieval_cost': round(retrieval_cost, 2),
+                    })
+        result = {'status': 'OPTIMAL' if status == pywraplp.Solver.OPTIMAL else 'FEASIBLE',
+                  'total_cost': round(solver.Objective().Value(), 2), 'assignments': assignments}
     else:
-        print('No optimal solution found.')
+        result = {'status': 'NOT_SOLVED', 'total_cost': None, 'assignments': []}
+    logger.info('GCS storage optimization result', extra={'data': {
+        'status': result['status'], 'total_cost': result['total_cost'], 'datasets': len(result['assignments'])}})
+    logger.debug('GCS storage assignments', extra={'data': result})
+    return result
 
-# Run the solver
-optimize_gcs_storage()
\ No newline at end of file
+if __name__ == "__main__":
+    # Run the solver
+    result = optimize_gcs_storage()
+    print(f"#### Status: {result['status']}, Total cost: ${result['total_cost']}/month")
+    for assignment in result['assignments']:
+        print(f"Dataset {assignment['dataset']}: {assignment['storage_class']}, "
+              f"Storage cost: ${assignment['storage_cost']:.2f}, "
+              f"Retrieval cost: ${assignment['retrieval_cost']:.2f}")
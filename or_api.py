@@ -1,13 +1,14 @@
 from ortools.math_opt.python import mathopt
 import pandas as pd
-from google.cloud import storage, bigquery
+from gcp_clients import bigquery_client, storage_client
+from solver_telemetry import build_phase, solve_mathopt
+from solver_backends import mathopt_solver
 
-# Initialize GCP clients
-storage_client = storage.Client()
-bq_client = bigquery.Client()
+# Initialize GCP clients (application default credentials, as before)
+bq_client = bigquery_client(default_credentials=True)
 
-# Load data from GCS
-bucket = storage_client.get_bucket("my-bucket")
+# Load data from GCS (GCP_CLIENT_MODE=replay serves recorded copies of the files)
+bucket = storage_client().get_bucket("my-bucket")
 blob = bucket.get_blob("query_data.csv")
 query_data = pd.read_csv(blob.download_as_string())
 blob = bucket.get_blob("cost_data.csv")
@@ -15,29 +16,29 @@ cost_data = pd.read_csv(blob.download_as_string())
 
 # Create MathOpt model
 model = mathopt.Model(name="bigquery_cost_optimization")
-
-# Variables: slots per project
-slots = {}
-for idx, row in query_data.iterrows():
-    project_id = row["project_id"]
-    slots[project_id] = model.add_variable(lb=row["min_slots"], ub=1000, is_integer=False, name=f"slots_{project_id}")
-
-# Objective: Minimize total cost
-cost_expr = 0
-for idx, row in query_data.iterrows():
-    project_id = row["project_id"]
-    cost_per_byte = cost_data[cost_data["project_id"] == project_id]["cost_per_byte"].iloc[0]
-    slot_cost = cost_data[cost_data["project_id"] == project_id]["slot_cost"].iloc[0]
-    cost_expr += (row["avg_bytes"] * cost_per_byte + slots[project_id] * slot_cost) * row["priority"]
-
-model.minimize(cost_expr)
-
-# Constraint: Total slots <= 2000
-model.add_linear_constraint(sum(slots.values()) <= 2000, name="total_slots")
-
-# Solve using GCP OR API (GLOP solver)
-params = mathopt.SolveParameters()
-result = mathopt.solve(model, mathopt.SolverType.GLOP, params=params, api_key="your_or_api_key")
+with build_phase('or_api', model):
+    # Variables: slots per project
+    slots = {}
+    for idx, row in query_data.iterrows():
+        project_id = row["project_id"]
+        slots[project_id] = model.add_variable(lb=row["min_slots"], ub=1000, is_integer=False, name=f"slots_{project_id}")
+
+    # Objective: Minimize total cost
+    cost_expr = 0
+    for idx, row in query_data.iterrows():
+        project_id = row["project_id"]
+        cost_per_byte = cost_data[cost_data["project_id"] == project_id]["cost_per_byte"].iloc[0]
+        slot_cost = cost_data[cost_data["project_id"] == project_id]["slot_cost"].iloc[0]
+        cost_expr += (row["avg_bytes"] * cost_per_byte + slots[project_id] * slot_cost) * row["priority"]
+
+    model.minimize(cost_expr)
+
+    # Constraint: Total slots <= 2000
+    model.add_linear_constraint(sum(slots.values()) <= 2000, name="total_slots")
+
+# Solve using GCP OR API (GLOP solver; any MathOpt backend from solver_backends works)
+solver_type, params = mathopt_solver('GLOP')
+result = solve_mathopt('or_api', model, solver_type, params=params, api_key="your_or_api_key")
 
 # Output results
 if result.termination_reason == mathopt.TerminationReason.OPTIMAL:
@@ -1,8 +1,8 @@
-from google.cloud import logging_v2
+from gcp_clients import logging_client
 from datetime import datetime, timedelta
 
 def query_gcs_access_logs(project_id, bucket_name, days=30):
-    client = logging_v2.Client(project=project_id)
+    client = logging_client(project_id)
     logger = client.logger('cloudaudit.googleapis.com%2Fdata_access')  # audit logs for data access
 
     # Construct filter string
@@ -17,6 +17,18 @@ def query_gcs_access_logs(project_id, bucket_name, days=30):
     # Query entries
     entries = client.list_entries(filter_=filter_str)
 
+    return count_accesses(entries)
+
+def count_accesses(entries):
+    """
+    Count data-access log entries per object resource name in a single pass.
+
+    Args:
+        entries (Iterable): Log entries whose `payload` dict has a 'resourceName'.
+
+    Returns:
+        dict: resource name -> number of accesses.
+    """
     access_counts = {}
 
     for entry in entries:
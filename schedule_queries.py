@@ -1,81 +1,127 @@
+import logging
 from ortools.linear_solver import pywraplp
+from solver_telemetry import build_phase, solve
+from solver_backends import create_solver, solver_parameters
+
+logger = logging.getLogger(__name__)
+
+# Problem data
+QUERIES = [
+    {'data_scanned': 0.5, 'slots_required': 20, 'runtime': 1, 'deadline': 6},  # Q1: 0.5 TB, due 3 PM
+    {'data_scanned': 2.0, 'slots_required': 50, 'runtime': 2, 'deadline': 8},  # Q2: 2.0 TB, due 5 PM
+    {'data_scanned': 1.0, 'slots_required': 30, 'runtime': 1, 'deadline': 9},  # Q3: 1.0 TB, due 6 PM
+]
+
+def schedule_queries(queries: list = None, time_slots: int = 9, on_demand_cost: float = 5.0,
+                     flat_rate_cost: float = 4.0, max_slots: int = 100, backend: str = 'SCIP',
+                     time_limit_s: float = 0, relative_gap: float = 0, num_workers: int = 0):
+    """
+    Schedule queries over hourly time slots and pick flat-rate or on-demand pricing for each.
+
+    Args:
+        queries (list): Dicts with 'data_scanned' (TB), 'slots_required' (flat-rate slots),
+            'runtime' (hours) and 'deadline' (time slot by which the query must finish).
+            Defaults to `QUERIES`.
+        time_slots (int): Number of hourly slots in the window, starting at 9 AM.
+        on_demand_cost (float): On-demand price in $/TB.
+        flat_rate_cost (float): Flat-rate price in $/hour for `max_slots` slots.
+        max_slots (int): Flat-rate slot capacity.
+        backend (str): MIP solver backend: 'SCIP', 'CBC', 'CP-SAT' or 'HIGHS'.
+        time_limit_s (float): Solver time limit in seconds; 0 means no limit.
+        relative_gap (float): Relative MIP gap at which to stop; 0 keeps the solver default.
+        num_workers (int): Solver threads; 0 keeps the solver default.
+
+    Returns:
+        dict: 'status' ('OPTIMAL', 'FEASIBLE' or 'NOT_SOLVED'), 'total_cost' and one 'schedule'
+        entry per query, or None if the solver could not be created.
+
+    Raises:
+        ValueError: If `backend` is unknown or LP-only (see `solver_backends.create_solver`).
+    """
+    queries = QUERIES if queries is None else queries
 
-def schedule_queries():
     # Create the MIP solver
-    solver = pywraplp.Solver.CreateSolver('SCIP')
+    solver = create_solver(backend, time_limit_s, num_workers)
     if not solver:
-        print("Solver not created.")
+        logger.error('Solver not created', extra={'data': {'backend': backend}})
         return
 
-    # Problem data
-    num_queries = 3
-    time_slots = 9  # 9 AM to 6 PM (hourly slots)
-    data_scanned = [0.5, 2.0, 1.0]  # TB scanned by queries Q1, Q2, Q3
-    slots_required = [20, 50, 30]  # Slots for Q1, Q2, Q3 (flat-rate)
-    runtimes = [1, 2, 1]  # Hours required by Q1, Q2, Q3
-    deadlines = [6, 8, 9]  # Deadlines in time slots (3 PM, 5 PM, 6 PM)
-    on_demand_cost = 5.0  # $5/TB
-    flat_rate_cost = 4.0  # $4/hour for 100 slots
-    max_slots = 100  # Flat-rate slot capacity
-
-    # Variables
-    # x[i][t]: 1 if query i starts at time t, 0 otherwise
-    # x[i][t]: Binary variable indicating if query i starts at time t.
-    x = [[solver.BoolVar(f'x[{i}][{t}]') for t in range(time_slots)] for i in range(num_queries)]
-    # y[i]: 1 if query i uses on-demand, 0 if flat-rate
-    # y[i]: Binary variable indicating the pricing method for query i (1 = on-demand, 0 = flat-rate).
-    y = [solver.BoolVar(f'y[{i}]') for i in range(num_queries)]
-    # s[i][t]: Slots used by query i at time t (flat-rate only)
-    # s[i][t]: Continuous variable for slots used by query i at time t under flat-rate.
-    s = [[solver.NumVar(0, max_slots, f's[{i}][{t}]') for t in range(time_slots)] for i in range(num_queries)]
-
-    # Constraints
-    # 1. Each query runs exactly once
-    for i in range(num_queries):
-        solver.Add(sum(x[i][t] for t in range(time_slots)) == 1)
-
-    # 2. Respect deadlines and runtime
-    for i in range(num_queries):
-        for t in range(time_slots):
-            if t + runtimes[i] > deadlines[i]:
-                solver.Add(x[i][t] == 0)  # Cannot start if it exceeds deadline
+    with build_phase('schedule_queries', solver):
+        num_queries = len(queries)
+        data_scanned = [q['data_scanned'] for q in queries]  # TB scanned by each query
+        slots_required = [q['slots_required'] for q in queries]  # Slots for each query (flat-rate)
+        runtimes = [q['runtime'] for q in queries]  # Hours required by each query
+        deadlines = [q['deadline'] for q in queries]  # Deadlines in time slots
 
-    # 3. Slot usage for flat-rate queries
-    for i in range(num_queries):
+        # Variables
+        # x[i][t]: 1 if query i starts at time t, 0 otherwise
+        # x[i][t]: Binary variable indicating if query i starts at time t.
+        x = [[solver.BoolVar(f'x[{i}][{t}]') for t in range(time_slots)] for i in range(num_queries)]
+        # y[i]: 1 if query i uses on-demand, 0 if flat-rate
+        # y[i]: Binary variable indicating the pricing method for query i (1 = on-demand, 0 = flat-rate).
+        y = [solver.BoolVar(f'y[{i}]') for i in range(num_queries)]
+        # s[i][t]: Slots used by query i at time t (flat-rate only)
+        # s[i][t]: Continuous variable for slots used by query i at time t under flat-rate.
+        s = [[solver.NumVar(0, max_slots, f's[{i}][{t}]') for t in range(time_slots)] for i in range(num_queries)]
+
+        # Constraints
+        # 1. Each query runs exactly once
+        for i in range(num_queries):
+            solver.Add(sum(x[i][t] for t in range(time_slots)) == 1)
+
+        # 2. Respect deadlines and runtime
+        for i in range(num_queries):
+            for t in range(time_slots):
+                if t + runtimes[i] > deadlines[i]:
+                    solver.Add(x[i][t] == 0)  # Cannot start if it exceeds deadline
+
+        # 3. Slot usage for flat-rate queries: a query started at t holds its
+        # slots in every hour t .. t + runtime - 1, so flat-rate queries compete
+        # for max_slots and the ones that do not fit must go on-demand
+        for i in range(num_queries):
+            for t in range(time_slots):
+                # 1 if query i is running at time t
+                running = sum(x[i][start] for start in range(max(0, t - runtimes[i] + 1), t + 1))
+                solver.Add(s[i][t] <= slots_required[i] * running)
+                # Ensures slots used cannot exceed maximum available flat-rate slots.
+                solver.Add(s[i][t] <= max_slots * (1 - y[i]))
+                # A running flat-rate query (y[i] = 0) uses all the slots it requires
+                solver.Add(s[i][t] >= slots_required[i] * (running - y[i]))
+
+        # 4. Total slots per time slot <= max_slots
         for t in range(time_slots):
-            # If query i starts at t and uses flat-rate (y[i] = 0), assign slots
-            solver.Add(s[i][t] <= slots_required[i] * x[i][t])
-            solver.Add(s[i][t] <= max_slots * (1 - y[i]))
-            # For runtime > 1, assign slots to subsequent time slots
-            for k in range(1, runtimes[i]):
-                if t + k < time_slots:
-                    # For runtimes longer than 1 hour, also assigns slots at subsequent time slots.
-                    solver.Add(s[i][t + k] <= slots_required[i] * x[i][t])
-                    # Ensures slots used cannot exceed maximum available flat-rate slots.
-                    solver.Add(s[i][t + k] <= max_slots * (1 - y[i]))
-
-    # 4. Total slots per time slot <= max_slots
-    for t in range(time_slots):
-        solver.Add(sum(s[i][t] for i in range(num_queries)) <= max_slots)
-
-    # Objective: Minimize total cost
-    # On-demand cost + flat-rate cost (flat-rate cost is fixed at $4/hour × 9 hours)
-    on_demand_cost_expr = sum(y[i] * data_scanned[i] * on_demand_cost for i in range(num_queries))
-    total_cost = on_demand_cost_expr + flat_rate_cost * time_slots
-    solver.Minimize(total_cost)
+            solver.Add(sum(s[i][t] for i in range(num_queries)) <= max_slots)
+
+        # Objective: Minimize total cost
+        # On-demand cost + flat-rate cost (flat-rate cost is fixed at flat_rate_cost/hour × time_slots)
+        on_demand_cost_expr = sum(y[i] * data_scanned[i] * on_demand_cost for i in range(num_queries))
+        total_cost = on_demand_cost_expr + flat_rate_cost * time_slots
+        solver.Minimize(total_cost)
 
     # Solve
-    status = solver.Solve()
-    if status == pywraplp.Solver.OPTIMAL:
-        print(f'Optimal solution found. Total cost: ${solver.Objective().Value():.2f}')
+    status = solve('schedule_queries', solver, solver_parameters(relative_gap), backend)
+    # FEASIBLE: stopped early by time_limit_s / relative_gap with a usable solution
+    if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        schedule = []
         for i in range(num_queries):
             for t in range(time_slots):
                 if x[i][t].solution_value() > 0.5:
                     pricing = 'On-demand' if y[i].solution_value() > 0.5 else 'Flat-rate'
-                    print(f'Query {i+1}: Start at {9+t} AM, Pricing: {pricing}, '
-                          f'Slots: {s[i][t].solution_value() if not y[i].solution_value() else 0}')
+                    slots = s[i][t].solution_value() if not y[i].solution_value() else 0
+                    schedule.append({'query': i + 1, 'start_hour': 9 + t, 'pricing': pricing, 'slots': slots})
+        result = {'status': 'OPTIMAL' if status == pywraplp.Solver.OPTIMAL else 'FEASIBLE',
+                  'total_cost': round(solver.Objective().Value(), 2), 'schedule': schedule}
     else:
-        print('No optimal solution found.')
+        result = {'status': 'NOT_SOLVED', 'total_cost': None, 'schedule': []}
+    logger.info('Query schedule result', extra={'data': {
+        'status': result['status'], 'total_cost': result['total_cost'], 'queries': len(result['schedule'])}})
+    logger.debug('Query schedule', extra={'data': result})
+    return result
 
-# Run the solver
-schedule_queries()
\ No newline at end of file
+if __name__ == "__main__":
+    # Run the solver
+    result = schedule_queries()
+    print(f"#### Status: {result['status']}, Total cost: ${result['total_cost']}")
+    for entry in result['schedule']:
+        print(f"Query {entry['query']}: Start at {entry['start_hour']} AM, Pricing: {entry['pricing']}, "
+              f"Slots: {entry['slots']}")
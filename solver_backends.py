@@ -0,0 +1,121 @@
+from datetime import timedelta
+from ortools.linear_solver import pywraplp
+
+# Backend name -> pywraplp.Solver.CreateSolver id
+BACKENDS = {
+    'SCIP': 'SCIP',
+    'CBC': 'CBC',
+    'CP-SAT': 'CP_SAT',
+    'HIGHS': 'HIGHS',
+    'GLOP': 'GLOP',
+}
+
+# Backends that only solve the LP relaxation (integrality is ignored)
+LP_ONLY_BACKENDS = {'GLOP'}
+
+
+def normalize_backend(backend: str):
+    """
+    Map user spellings ('cp_sat', 'CP-SAT', 'highs', ...) to a key of `BACKENDS`.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    name = backend.strip().upper().replace('_', '-')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown solver backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    return name
+
+
+def create_solver(backend: str = 'SCIP', time_limit_s: float = 0, num_workers: int = 0, mip: bool = True):
+    """
+    Create a pywraplp solver for `backend` with the given limits applied.
+
+    Args:
+        backend (str): One of 'SCIP', 'CBC', 'CP-SAT', 'HIGHS', 'GLOP'.
+        time_limit_s (float): Wall-clock limit in seconds; 0 means no limit.
+        num_workers (int): Solver threads; 0 keeps the backend default. Ignored by
+            backends without multi-threading support (e.g. GLOP).
+        mip (bool): The model has integer variables. LP-only backends would silently
+            solve its relaxation and report fractional values as OPTIMAL, so they
+            are rejected.
+
+    Returns:
+        pywraplp.Solver: The solver, or None if this OR-Tools build lacks the backend.
+
+    Raises:
+        ValueError: If the backend is unknown, or LP-only while `mip` is set.
+    """
+    name = normalize_backend(backend)
+    if mip and name in LP_ONLY_BACKENDS:
+        raise ValueError(f"Solver backend '{backend}' only solves LPs; use one of "
+                         f"{', '.join(b for b in BACKENDS if b not in LP_ONLY_BACKENDS)} for integer models")
+    solver = pywraplp.Solver.CreateSolver(BACKENDS[name])
+    if not solver:
+        return None
+    if time_limit_s:
+        solver.SetTimeLimit(int(time_limit_s * 1000))
+    if num_workers:
+        solver.SetNumThreads(num_workers)
+    return solver
+
+
+def solver_parameters(relative_gap: float = 0):
+    """
+    Build the MPSolverParameters passed to `solver.Solve()`.
+
+    Args:
+        relative_gap (float): Relative MIP gap at which to stop; 0 keeps the backend default.
+
+    Returns:
+        pywraplp.MPSolverParameters: The parameters, or None when nothing is overridden.
+    """
+    if not relative_gap:
+        return None
+    params = pywraplp.MPSolverParameters()
+    params.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, relative_gap)
+    return params
+
+
+def mathopt_solver(backend: str = 'GLOP', time_limit_s: float = 0, relative_gap: float = 0, num_workers: int = 0):
+    """
+    Return the MathOpt solver type and SolveParameters for `backend`.
+
+    CBC is not available through MathOpt, and its HiGHS interface does not accept
+    a thread count.
+
+    Args:
+        backend (str): One of 'SCIP', 'CP-SAT', 'HIGHS', 'GLOP'.
+        time_limit_s (float): Wall-clock limit in seconds; 0 means no limit.
+        relative_gap (float): Relative MIP gap at which to stop; 0 keeps the default.
+        num_workers (int): Solver threads; 0 keeps the backend default.
+
+    Returns:
+        tuple: (mathopt.SolverType, mathopt.SolveParameters)
+
+    Raises:
+        ValueError: If the backend is unknown or not available through MathOpt, or
+            `num_workers` is set for HiGHS.
+    """
+    from ortools.math_opt.python import mathopt
+
+    solver_types = {
+        'SCIP': mathopt.SolverType.GSCIP,
+        'CP-SAT': mathopt.SolverType.CP_SAT,
+        'HIGHS': mathopt.SolverType.HIGHS,
+        'GLOP': mathopt.SolverType.GLOP,
+    }
+    name = normalize_backend(backend)
+    if name not in solver_types:
+        raise ValueError(f"Solver backend '{backend}' is not available through MathOpt")
+    # MathOpt's HiGHS fails the whole solve with an opaque StatusNotOk on `threads`
+    if name == 'HIGHS' and num_workers:
+        raise ValueError("Solver backend 'HIGHS' does not support num_workers through MathOpt")
+    params = mathopt.SolveParameters()
+    if time_limit_s:
+        params.time_limit = timedelta(seconds=time_limit_s)
+    if relative_gap:
+        params.relative_gap_tolerance = relative_gap
+    if num_workers:
+        params.threads = num_workers
+    return solver_types[name], params
@@ -0,0 +1,229 @@
+import atexit
+import math
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from config import TELEMETRY_FILE
+from solver_backends import normalize_backend
+
+# pywraplp.Solver result status codes -> names
+MPSOLVER_STATUS = {
+    0: 'OPTIMAL',
+    1: 'FEASIBLE',
+    2: 'INFEASIBLE',
+    3: 'UNBOUNDED',
+    4: 'ABNORMAL',
+    5: 'MODEL_INVALID',
+    6: 'NOT_SOLVED',
+}
+
+# MIP backends whose pywraplp interface has no branch-and-bound node count
+NODELESS_BACKENDS = {'HIGHS'}
+
+_telemetry = None
+
+
+def _get_telemetry():
+    """
+    Create the tracer and instruments on first use.
+
+    Spans and metrics are written as JSON lines to `config.TELEMETRY_FILE`
+    (override with the SOLVER_TELEMETRY_FILE environment variable), one file per
+    process with the process id before the suffix, e.g. solver_telemetry.1234.jsonl,
+    so the service's worker processes never interleave partial lines. Private
+    providers are used so the agent's own OpenTelemetry setup is not touched.
+    """
+    global _telemetry
+    if _telemetry is None:
+        path = Path(os.getenv('SOLVER_TELEMETRY_FILE', str(TELEMETRY_FILE)))
+        telemetry_file = open(path.with_name(f'{path.stem}.{os.getpid()}{path.suffix}'), 'a', encoding='utf-8')
+        resource = Resource.create({'service.name': 'gcp-cost-optimization'})
+
+        tracer_provider = TracerProvider(resource=resource)
+        tracer_provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+            out=telemetry_file, formatter=lambda span: span.to_json(indent=None) + '\n')))
+
+        meter_provider = MeterProvider(resource=resource, metric_readers=[PeriodicExportingMetricReader(
+            ConsoleMetricExporter(out=telemetry_file, formatter=lambda metrics: metrics.to_json(indent=None) + '\n'),
+            export_interval_millis=60000)])
+        meter = meter_provider.get_meter(__name__)
+
+        def shutdown():
+            tracer_provider.shutdown()
+            meter_provider.shutdown()
+            telemetry_file.close()
+        atexit.register(shutdown)
+
+        _telemetry = {
+            'tracer_provider': tracer_provider,
+            'tracer': tracer_provider.get_tracer(__name__),
+            'build_time': meter.create_histogram('solver.build.duration', unit='ms',
+                                                 description='Wall time to build an optimization model'),
+            'solve_time': meter.create_histogram('solver.solve.duration', unit='ms',
+                                                 description='Wall time of solver.Solve()'),
+            'mip_gap': meter.create_histogram('solver.mip_gap', unit='1',
+                                              description='Relative gap between objective and best bound'),
+            'variables': meter.create_histogram('solver.model.variables', unit='{variable}',
+                                                description='Number of variables in a solved model'),
+            'constraints': meter.create_histogram('solver.model.constraints', unit='{constraint}',
+                                                  description='Number of constraints in a solved model'),
+        }
+    return _telemetry
+
+
+def add_span_processor(processor):
+    """
+    Send solver spans to an extra OpenTelemetry span processor as well as the file.
+
+    Used by the benchmark suite to read build/solve wall times from the spans.
+    """
+    _get_telemetry()['tracer_provider'].add_span_processor(processor)
+
+
+def _model_size(model):
+    """
+    Return (variables, constraints) of a pywraplp.Solver or a mathopt.Model.
+    """
+    if hasattr(model, 'NumVariables'):
+        return model.NumVariables(), model.NumConstraints()
+    return model.get_num_variables(), model.get_num_linear_constraints()
+
+
+def _relative_gap(objective, bound):
+    # LP-only backends and some MIP backends report an infinite best bound
+    if objective is None or bound is None or not math.isfinite(bound):
+        return None
+    return abs(objective - bound) / max(abs(objective), 1e-9)
+
+
+@contextmanager
+def build_phase(optimizer: str, model):
+    """
+    Record a span for building an optimization model.
+
+    Wrap the code that adds variables, constraints and the objective. On exit the
+    span gets the wall time and the model's variable/constraint counts.
+
+    Args:
+        optimizer (str): Name of the optimizer, e.g. 'optimize_slots'.
+        model: The pywraplp.Solver or mathopt.Model being built.
+
+    Yields:
+        Span: The active OpenTelemetry span.
+    """
+    telemetry = _get_telemetry()
+    with telemetry['tracer'].start_as_current_span(f'{optimizer}.build') as span:
+        started = time.perf_counter()
+        yield span
+        build_ms = (time.perf_counter() - started) * 1000
+        num_variables, num_constraints = _model_size(model)
+        span.set_attributes({
+            'optimizer': optimizer,
+            'model.variables': num_variables,
+            'model.constraints': num_constraints,
+            'build.wall_time_ms': build_ms,
+        })
+        telemetry['build_time'].record(build_ms, {'optimizer': optimizer})
+
+
+def solve(optimizer: str, solver, params=None, backend: str = None):
+    """
+    Call `solver.Solve()` on a pywraplp.Solver and record a span and metrics for it.
+
+    The span carries the backend name and version, model size, wall time, status
+    name, objective, best bound and relative MIP gap (the last three only when a
+    solution exists), iterations and, for MIP backends, branch-and-bound nodes.
+
+    Args:
+        optimizer (str): Name of the optimizer, e.g. 'optimize_slots'.
+        solver (pywraplp.Solver): A fully built solver.
+        params (pywraplp.MPSolverParameters): Optional parameters passed to `Solve()`
+            (see `solver_backends.solver_parameters`).
+        backend (str): Backend the solver was created for (see `solver_backends.BACKENDS`);
+            metrics are grouped by it.
+
+    Returns:
+        int: The status returned by `solver.Solve()`.
+    """
+    telemetry = _get_telemetry()
+    with telemetry['tracer'].start_as_current_span(f'{optimizer}.solve') as span:
+        started = time.perf_counter()
+        status = solver.Solve(params) if params else solver.Solve()
+        solve_ms = (time.perf_counter() - started) * 1000
+        status_name = MPSOLVER_STATUS.get(status, str(status))
+        objective = bound = None
+        if status_name in ('OPTIMAL', 'FEASIBLE'):
+            objective = solver.Objective().Value()
+            bound = solver.Objective().BestBound()
+        backend_name = normalize_backend(backend) if backend else 'UNKNOWN'
+        _record_solve(telemetry, span, optimizer, backend_name, solver, solve_ms, status_name, objective, bound)
+        span.set_attributes({'solver.version': solver.SolverVersion(), 'solver.iterations': solver.iterations()})
+        # nodes() is only defined for MIP backends; LP backends and HiGHS (which reports
+        # IsMip() but has no node count) print an error for it and return -1
+        if solver.IsMip() and backend_name not in NODELESS_BACKENDS:
+            nodes = solver.nodes()
+            if nodes >= 0:
+                span.set_attribute('solver.nodes', nodes)
+    return status
+
+
+def solve_mathopt(optimizer: str, model, solver_type, **kwargs):
+    """
+    Call `mathopt.solve(model, solver_type, **kwargs)` and record a span and metrics for it.
+
+    Args:
+        optimizer (str): Name of the optimizer, e.g. 'or_api'.
+        model (mathopt.Model): A fully built model.
+        solver_type (mathopt.SolverType): Backend to solve with.
+        **kwargs: Passed through to `mathopt.solve` (params, api_key, ...).
+
+    Returns:
+        mathopt.SolveResult: The solve result.
+    """
+    from ortools.math_opt.python import mathopt
+
+    telemetry = _get_telemetry()
+    with telemetry['tracer'].start_as_current_span(f'{optimizer}.solve') as span:
+        started = time.perf_counter()
+        result = mathopt.solve(model, solver_type, **kwargs)
+        solve_ms = (time.perf_counter() - started) * 1000
+        objective = bound = None
+        if result.has_primal_feasible_solution():
+            objective = result.objective_value()
+            bound = result.termination.objective_bounds.dual_bound
+        _record_solve(telemetry, span, optimizer, solver_type.name, model, solve_ms,
+                      result.termination.reason.name, objective, bound)
+    return result
+
+
+def _record_solve(telemetry, span, optimizer, backend, model, solve_ms, status_name, objective, bound):
+    num_variables, num_constraints = _model_size(model)
+    gap = _relative_gap(objective, bound)
+    attributes = {
+        'optimizer': optimizer,
+        'solver.backend': backend,
+        'solver.status': status_name,
+        'model.variables': num_variables,
+        'model.constraints': num_constraints,
+        'solve.wall_time_ms': solve_ms,
+    }
+    if objective is not None:
+        attributes['solver.objective'] = objective
+    if bound is not None and math.isfinite(bound):
+        attributes['solver.best_bound'] = bound
+    if gap is not None:
+        attributes['solver.mip_gap'] = gap
+    span.set_attributes(attributes)
+
+    metric_attributes = {'optimizer': optimizer, 'solver.backend': backend, 'solver.status': status_name}
+    telemetry['solve_time'].record(solve_ms, metric_attributes)
+    telemetry['variables'].record(num_variables, {'optimizer': optimizer})
+    telemetry['constraints'].record(num_constraints, {'optimizer': optimizer})
+    if gap is not None:
+        telemetry['mip_gap'].record(gap, {'optimizer': optimizer})
@@ -0,0 +1,205 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from config import LOG_FILE, LOG_LEVELS, LOG_TO_CLOUD
+
+# Attributes every LogRecord has; anything else on a record came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+_STOP = object()
+
+_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One compact JSON object per record: time, level, logger, message and every
+    field passed with `extra`, e.g.
+
+        logger.info('Slot utilization result', extra={'data': results})
+        {"time":"2025-08-01T09:00:00.123+00:00","level":"INFO","logger":"bigquery.slot_utilization_gemini",
+         "message":"Slot utilization result","data":{"project_id":"...","total_slot_hours_consumed":1.2}}
+    """
+    def to_dict(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return entry
+
+    def format(self, record):
+        return json.dumps(self.to_dict(record), default=str, separators=(',', ':'))
+
+
+class JsonLinesFileSink:
+    """
+    Appends each batch of records to a JSON-lines file with a single write.
+
+    Every process gets its own file (the process id is added to the name), so
+    solver workers and concurrent runs never interleave partial lines.
+    """
+    def __init__(self, path):
+        path = Path(path)
+        self.path = path.with_name(f'{path.stem}.{os.getpid()}{path.suffix}')
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._formatter = JsonFormatter()
+
+    def write(self, records):
+        self._file.write(''.join(self._formatter.format(record) + '\n' for record in records))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CloudLoggingSink:
+    """
+    Sends each batch of records to Cloud Logging as structured entries in one API call.
+    """
+    def __init__(self, project: str = None, log_name: str = 'gcp-cost-optimization'):
+        import google.cloud.logging
+
+        self._logger = google.cloud.logging.Client(project=project).logger(log_name)
+        self._formatter = JsonFormatter()
+
+    def write(self, records):
+        batch = self._logger.batch()
+        for record in records:
+            batch.log_struct(self._formatter.to_dict(record), severity=record.levelname)
+        batch.commit()
+
+    def close(self):
+        pass
+
+
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts records on the queue as they are. Unlike QueueHandler it does not format
+    them first, so the caller pays only for the put. Objects passed in `extra` or
+    as message arguments are serialized later and must not be mutated after logging.
+    When the queue is full the record is dropped and counted.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingListener:
+    """
+    Background thread that drains the log queue and hands records to the sinks in batches.
+
+    After the first record of a batch it waits up to `linger_s` for more, so bursts
+    are written together, and writes as soon as `batch_size` records are collected.
+    A failing sink is reported on stderr and does not stop the other sinks.
+    """
+    def __init__(self, log_queue, sinks, batch_size: int = 500, linger_s: float = 0.2):
+        self.queue = log_queue
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.linger_s = linger_s
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            if record is _STOP:
+                return
+            batch = [record]
+            deadline = time.monotonic() + self.linger_s
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                    break
+                batch.append(record)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        for sink in self.sinks:
+            try:
+                sink.write(batch)
+            except Exception as e:
+                print(f'structured_logging: {type(sink).__name__} failed: {e}', file=sys.stderr)
+
+    def stop(self):
+        """
+        Write what is still queued, then close the sinks.
+        """
+        self.queue.put(_STOP)
+        self._thread.join()
+        for sink in self.sinks:
+            sink.close()
+
+
+def setup_logging(log_file=LOG_FILE, levels: dict = None, cloud: bool = LOG_TO_CLOUD, batch_size: int = 500,
+                  linger_s: float = 0.2, max_queue: int = 100000):
+    """
+    Route all logging through a queue to a background writer.
+
+    Records are written as JSON lines to a per-process copy of `log_file`
+    (see `JsonLinesFileSink`), and also to Cloud Logging
+    when `cloud` is set. Logging calls on the hot path only enqueue the record;
+    formatting, serialization and I/O happen on the writer thread. Calling this
+    again only updates the levels.
+
+    Args:
+        log_file: JSON-lines file (config.LOG_FILE); None disables the file sink.
+        levels (dict): Logger name -> level name, '' for the root logger
+            (defaults to config.LOG_LEVELS).
+        cloud (bool): Also export to Cloud Logging (config.LOG_TO_CLOUD / LOG_TO_CLOUD=1).
+        batch_size (int): Most records per write.
+        linger_s (float): How long a batch waits for more records.
+        max_queue (int): Records buffered before new ones are dropped.
+
+    Returns:
+        BatchingListener: The running writer (stopped automatically at exit).
+    """
+    global _listener
+    for name, level in (LOG_LEVELS if levels is None else levels).items():
+        logging.getLogger(name or None).setLevel(level)
+    with _lock:
+        if _listener is None:
+            sinks = []
+            if log_file:
+                sinks.append(JsonLinesFileSink(log_file))
+            if cloud:
+                sinks.append(CloudLoggingSink())
+            log_queue = queue.Queue(max_queue)
+            _listener = BatchingListener(log_queue, sinks, batch_size, linger_s)
+            _listener.start()
+            logging.getLogger().addHandler(_EnqueueHandler(log_queue))
+            atexit.register(_listener.stop)
+    return _listener
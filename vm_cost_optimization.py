@@ -1,41 +1,90 @@
+import logging
 from ortools.linear_solver import pywraplp
+from solver_telemetry import build_phase, solve
+from solver_backends import create_solver, solver_parameters
 
-solver = pywraplp.Solver.CreateSolver('SCIP')
-
-standard = solver.IntVar(0, 100, 'standard')
-spot = solver.IntVar(0, 100, 'spot')
-cud = solver.BoolVar('cud')  # Enable CUD?
-
-# Auxiliary var for product standard * cud
-standard_cud = solver.IntVar(0, 100, 'standard_cud')
-
-# Constraints to linearize standard_cud = standard * cud
-solver.Add(standard_cud <= standard)
-solver.Add(standard_cud <= 100 * cud)
-solver.Add(standard_cud >= standard - 100 * (1 - cud))
-solver.Add(standard_cud >= 0)
-
-# Constraints
-solver.Add(standard + spot == 100)
-solver.Add(spot <= 50)
-
-# Cost terms
-cost_standard = 0.04 * standard - 0.012 * standard_cud
-cost_spot = 0.01 * spot
-
-# Objective
-objective = solver.Objective()
-objective.SetCoefficient(standard, 0.04)
-objective.SetCoefficient(standard_cud, -0.012)
-objective.SetCoefficient(spot, 0.01)
-objective.SetMinimization()
-
-status = solver.Solve()
-
-if status == pywraplp.Solver.OPTIMAL:
-    print(f'Standard vCPUs: {standard.solution_value()}')
-    print(f'Spot vCPUs: {spot.solution_value()}')
-    print(f'CUD Enabled: {cud.solution_value()}')
-    print(f'Total Cost: {solver.Objective().Value()} $/hour')
-else:
-    print("The solver did not find an optimal solution.")
+logger = logging.getLogger(__name__)
+
+def optimize_vm_cost(total_vcpus: int = 100, max_spot_vcpus: int = 50, standard_cost: float = 0.04,
+                     cud_discount: float = 0.012, spot_cost: float = 0.01, backend: str = 'SCIP',
+                     time_limit_s: float = 0, relative_gap: float = 0, num_workers: int = 0):
+    """
+    Split a vCPU pool between standard and spot VMs and decide whether to buy a CUD.
+
+    Args:
+        total_vcpus (int): vCPUs the pool must provide.
+        max_spot_vcpus (int): Upper bound on spot vCPUs.
+        standard_cost (float): Standard vCPU price in $/hour.
+        cud_discount (float): Committed use discount per standard vCPU in $/hour.
+        spot_cost (float): Spot vCPU price in $/hour.
+        backend (str): MIP solver backend: 'SCIP', 'CBC', 'CP-SAT' or 'HIGHS'.
+        time_limit_s (float): Solver time limit in seconds; 0 means no limit.
+        relative_gap (float): Relative MIP gap at which to stop; 0 keeps the solver default.
+        num_workers (int): Solver threads; 0 keeps the solver default.
+
+    Returns:
+        dict: 'status' ('OPTIMAL', 'FEASIBLE' or 'NOT_SOLVED'), 'standard_vcpus', 'spot_vcpus',
+        'cud_enabled' and 'total_cost' ($/hour), or None if the solver could not be created.
+
+    Raises:
+        ValueError: If `backend` is unknown or LP-only (see `solver_backends.create_solver`).
+    """
+    solver = create_solver(backend, time_limit_s, num_workers)
+    if not solver:
+        logger.error('Solver not created', extra={'data': {'backend': backend}})
+        return
+
+    with build_phase('optimize_vm_cost', solver):
+        standard = solver.IntVar(0, total_vcpus, 'standard')
+        spot = solver.IntVar(0, total_vcpus, 'spot')
+        cud = solver.BoolVar('cud')  # Enable CUD?
+
+        # Auxiliary var for product standard * cud
+        standard_cud = solver.IntVar(0, total_vcpus, 'standard_cud')
+
+        # Constraints to linearize standard_cud = standard * cud
+        solver.Add(standard_cud <= standard)
+        solver.Add(standard_cud <= total_vcpus * cud)
+        solver.Add(standard_cud >= standard - total_vcpus * (1 - cud))
+        solver.Add(standard_cud >= 0)
+
+        # Constraints
+        solver.Add(standard + spot == total_vcpus)
+        solver.Add(spot <= max_spot_vcpus)
+
+        # Cost terms
+        cost_standard = standard_cost * standard - cud_discount * standard_cud
+        cost_spot = spot_cost * spot
+
+        # Objective
+        objective = solver.Objective()
+        objective.SetCoefficient(standard, standard_cost)
+        objective.SetCoefficient(standard_cud, -cud_discount)
+        objective.SetCoefficient(spot, spot_cost)
+        objective.SetMinimization()
+
+    status = solve('optimize_vm_cost', solver, solver_parameters(relative_gap), backend)
+
+    # FEASIBLE: stopped early by time_limit_s / relative_gap with a usable solution
+    if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        result = {
+            'status': 'OPTIMAL' if status == pywraplp.Solver.OPTIMAL else 'FEASIBLE',
+            'standard_vcpus': standard.solution_value(),
+            'spot_vcpus': spot.solution_value(),
+            'cud_enabled': cud.solution_value() > 0.5,
+            'total_cost': solver.Objective().Value(),
+        }
+    else:
+        result = {'status': 'NOT_SOLVED', 'standard_vcpus': None, 'spot_vcpus': None,
+                  'cud_enabled': None, 'total_cost': None}
+    logger.info('VM cost optimization result', extra={'data': {
+        'status': result['status'], 'total_cost': result['total_cost']}})
+    logger.debug('VM cost optimization plan', extra={'data': result})
+    return result
+
+if __name__ == "__main__":
+    result = optimize_vm_cost()
+    print(f"Standard vCPUs: {result['standard_vcpus']}")
+    print(f"Spot vCPUs: {result['spot_vcpus']}")
+    print(f"CUD Enabled: {result['cud_enabled']}")
+    print(f"Total Cost: {result['total_cost']} $/hour")